@@ -0,0 +1,34 @@
+"""Add keyset pagination indexes to posts and tags
+
+Revision ID: 3c9a41d27e5b
+Revises: 80512f8ce5d4
+Create Date: 2026-10-15 09:12:40.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = '3c9a41d27e5b'
+down_revision = '80512f8ce5d4'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index(
+        'ix_posts_is_deleted_created_at_id',
+        'posts',
+        ['is_deleted', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+    op.create_index(
+        'ix_tags_is_deleted_created_at_id',
+        'tags',
+        ['is_deleted', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+
+def downgrade():
+    op.drop_index('ix_tags_is_deleted_created_at_id', table_name='tags')
+    op.drop_index('ix_posts_is_deleted_created_at_id', table_name='posts')
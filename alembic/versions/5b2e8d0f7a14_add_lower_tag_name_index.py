@@ -0,0 +1,28 @@
+"""Add partial unique index on lower(tags.name)
+
+Revision ID: 5b2e8d0f7a14
+Revises: 3c9a41d27e5b
+Create Date: 2026-10-15 10:03:27.540196
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = '5b2e8d0f7a14'
+down_revision = '3c9a41d27e5b'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index(
+        'ix_tag_name_lower_active',
+        'tags',
+        [sa.text('lower(name)')],
+        unique=True,
+        postgresql_where=sa.text('is_deleted = false'),
+    )
+
+def downgrade():
+    op.drop_index('ix_tag_name_lower_active', table_name='tags')
@@ -0,0 +1,31 @@
+"""Drop global unique indexes on tag name, user email and username
+
+Revision ID: 7e4a1c9b3d52
+Revises: c3f8a2e9d610
+Create Date: 2026-10-15 16:02:41.518207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = '7e4a1c9b3d52'
+down_revision = 'c3f8a2e9d610'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # La unicidad la dan los índices parciales sobre lower(...) de las filas
+    # activas: los globales impedían reutilizar el nombre de una fila eliminada
+    op.drop_index('ix_tags_name', table_name='tags')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_index('ix_users_username', table_name='users')
+    # El login busca por username exacto
+    op.create_index('ix_users_username', 'users', ['username'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_users_username', table_name='users')
+    op.create_index('ix_users_username', 'users', ['username'], unique=True)
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_tags_name', 'tags', ['name'], unique=True)
@@ -0,0 +1,42 @@
+"""Set now() as server default for created_at / updated_at
+
+Revision ID: a7d3c91e4f28
+Revises: 5b2e8d0f7a14
+Create Date: 2026-10-15 11:26:51.384022
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'a7d3c91e4f28'
+down_revision = '5b2e8d0f7a14'
+branch_labels = None
+depends_on = None
+
+TABLES = ('users', 'posts', 'tags', 'comments')
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('created_at',
+                   existing_type=sa.DateTime(timezone=True),
+                   server_default=sa.text('now()'),
+                   existing_nullable=False)
+            batch_op.alter_column('updated_at',
+                   existing_type=sa.DateTime(timezone=True),
+                   server_default=sa.text('now()'),
+                   existing_nullable=True)
+
+def downgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('updated_at',
+                   existing_type=sa.DateTime(timezone=True),
+                   server_default=None,
+                   existing_nullable=True)
+            batch_op.alter_column('created_at',
+                   existing_type=sa.DateTime(timezone=True),
+                   server_default=None,
+                   existing_nullable=False)
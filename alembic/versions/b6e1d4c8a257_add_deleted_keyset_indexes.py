@@ -0,0 +1,36 @@
+"""Add partial keyset indexes for deleted posts and tags
+
+Revision ID: b6e1d4c8a257
+Revises: f2c7a9d4e813
+Create Date: 2026-10-15 14:02:31.504117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'b6e1d4c8a257'
+down_revision = 'f2c7a9d4e813'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index(
+        'ix_posts_deleted_at_id_deleted',
+        'posts',
+        [sa.text('deleted_at DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_where=sa.text('is_deleted = true'),
+    )
+    op.create_index(
+        'ix_tags_deleted_at_id_deleted',
+        'tags',
+        [sa.text('deleted_at DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_where=sa.text('is_deleted = true'),
+    )
+
+def downgrade():
+    op.drop_index('ix_tags_deleted_at_id_deleted', table_name='tags')
+    op.drop_index('ix_posts_deleted_at_id_deleted', table_name='posts')
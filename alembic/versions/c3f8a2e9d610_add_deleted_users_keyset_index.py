@@ -0,0 +1,28 @@
+"""Add partial keyset index for deleted users
+
+Revision ID: c3f8a2e9d610
+Revises: b6e1d4c8a257
+Create Date: 2026-10-15 14:37:09.826341
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'c3f8a2e9d610'
+down_revision = 'b6e1d4c8a257'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index(
+        'ix_users_deleted_at_id_deleted',
+        'users',
+        [sa.text('deleted_at DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_where=sa.text('is_deleted = true'),
+    )
+
+def downgrade():
+    op.drop_index('ix_users_deleted_at_id_deleted', table_name='users')
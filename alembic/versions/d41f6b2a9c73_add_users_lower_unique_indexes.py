@@ -0,0 +1,36 @@
+"""Add partial unique indexes on lower(email) / lower(username)
+
+Revision ID: d41f6b2a9c73
+Revises: a7d3c91e4f28
+Create Date: 2026-10-15 13:48:09.275310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'd41f6b2a9c73'
+down_revision = 'a7d3c91e4f28'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index(
+        'ux_users_email_active',
+        'users',
+        [sa.text('lower(email)')],
+        unique=True,
+        postgresql_where=sa.text('is_deleted = false'),
+    )
+    op.create_index(
+        'ux_users_username_active',
+        'users',
+        [sa.text('lower(username)')],
+        unique=True,
+        postgresql_where=sa.text('is_deleted = false'),
+    )
+
+def downgrade():
+    op.drop_index('ux_users_username_active', table_name='users')
+    op.drop_index('ux_users_email_active', table_name='users')
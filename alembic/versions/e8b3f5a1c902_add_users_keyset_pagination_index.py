@@ -0,0 +1,27 @@
+"""Add keyset pagination index to users
+
+Revision ID: e8b3f5a1c902
+Revises: d41f6b2a9c73
+Create Date: 2026-10-15 15:02:31.604417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'e8b3f5a1c902'
+down_revision = 'd41f6b2a9c73'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index(
+        'ix_users_is_deleted_created_at_id',
+        'users',
+        ['is_deleted', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+
+def downgrade():
+    op.drop_index('ix_users_is_deleted_created_at_id', table_name='users')
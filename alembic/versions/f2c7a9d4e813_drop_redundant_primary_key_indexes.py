@@ -0,0 +1,29 @@
+"""Drop redundant indexes on primary key columns
+
+Revision ID: f2c7a9d4e813
+Revises: e8b3f5a1c902
+Create Date: 2026-10-15 16:21:54.390172
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision = 'f2c7a9d4e813'
+down_revision = 'e8b3f5a1c902'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # La clave primaria ya tiene su propio índice único
+    op.drop_index('ix_comments_id', table_name='comments')
+    op.drop_index('ix_posts_id', table_name='posts')
+    op.drop_index('ix_users_id', table_name='users')
+    op.drop_index('ix_tags_id', table_name='tags')
+
+def downgrade():
+    op.create_index('ix_tags_id', 'tags', ['id'], unique=False)
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+    op.create_index('ix_posts_id', 'posts', ['id'], unique=False)
+    op.create_index('ix_comments_id', 'comments', ['id'], unique=False)
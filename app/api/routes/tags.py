@@ -1,12 +1,14 @@
+from typing import Optional, Union
+
 from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.crud import tag as crud_tag
-from app.crud import user as crud_user
+from app.core.deps import get_current_active_user
 from app.schemas.tag import Tag, TagCreate, TagUpdate, TagWithPosts
-from app.schemas.common import PaginatedResponse
 from app.models.user import User
 from app.core.logging import logger
+from app.core.pagination import cursor_page_response, decode_cursor
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
@@ -21,71 +23,54 @@ async def create_tag(
     request: Request,
     tag: TagCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(crud_user.get_current_active_user),
+    current_user: User = Depends(get_current_active_user),
 ):
     """
     Crea una nueva etiqueta. Solo accesible para administradores.
     """
-    try:
-        logger.info(f"Usuario {current_user.id} intenta crear tag: {tag.name}")
-
-        if not current_user.is_admin:
-            logger.warning(
-                f"Permiso denegado: usuario {current_user.id} intentó crear tag"
-            )
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Solo los administradores pueden crear etiquetas",
-            )
-
-        db_tag = await crud_tag.get_tag_by_name(db, name=tag.name)
-        if db_tag:
-            logger.warning(f"Intento de crear tag duplicado: {tag.name}")
-            raise HTTPException(status_code=400, detail="El nombre del tag ya existe")
+    logger.info(f"Usuario {current_user.id} intenta crear tag: {tag.name}")
 
-        db_tag = await crud_tag.create_tag(db=db, tag=tag)
-        logger.info(f"Tag creado: ID={db_tag.id}, Nombre='{db_tag.name}'")
-        return db_tag
+    if not current_user.is_admin:
+        logger.warning(f"Permiso denegado: usuario {current_user.id} intentó crear tag")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Solo los administradores pueden crear etiquetas",
+        )
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error inesperado al crear tag '{tag.name}': {str(e)}")
-        raise HTTPException(status_code=500, detail="Error interno del servidor")
+    db_tag = await crud_tag.create_tag(db=db, tag=tag)
+    logger.info(f"Tag creado: ID={db_tag.id}, Nombre='{db_tag.name}'")
+    return db_tag
 
 
-@router.get("/", response_model=PaginatedResponse[Tag])
+@router.get("/", response_model=list[Union[TagWithPosts, Tag]])
 @limiter.limit("50/minute")
 async def read_tags(
     request: Request,
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     limit: int = Query(10, ge=1),
+    include_posts: bool = False,
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Obtiene una lista paginada de tags activos.
+    Obtiene tags activos con paginación por cursor.
+    El cursor de la página siguiente se devuelve en la cabecera X-Next-Cursor.
+    Con include_posts=true cada tag incluye sus posts.
     Acceso público.
     """
+    logger.info(
+        f"Obteniendo tags (cursor={cursor}, limit={limit}, include_posts={include_posts})"
+    )
     try:
-        logger.info(f"Obteniendo tags (skip={skip}, limit={limit})")
-        db_tags, total = await crud_tag.get_tags_paginated(db, skip=skip, limit=limit)
-
-        pydantic_tags = [Tag.model_validate(db_tag) for db_tag in db_tags]
-        page = skip // limit + 1 if limit > 0 else 1
-        size = len(pydantic_tags)
-        total_pages = (total + limit - 1) // limit if limit > 0 else 1
-
-        logger.info(f"Tags obtenidos: {size} de {total} totales")
-        return PaginatedResponse[Tag](
-            items=pydantic_tags,
-            total=total,
-            page=page,
-            size=size,
-            total_pages=total_pages,
-        )
-    except Exception as e:
-        logger.error(f"Error al obtener tags paginados: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al obtener etiquetas")
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    tags, next_cursor = await crud_tag.get_tags(
+        db, after=after, limit=limit, include_posts=include_posts
+    )
+    logger.info(f"Tags obtenidos: {len(tags)}")
+    return cursor_page_response(
+        TagWithPosts if include_posts else Tag, tags, next_cursor
+    )
 
 
 @router.get("/{tag_id}", response_model=TagWithPosts)
@@ -95,18 +80,12 @@ async def read_tag(request: Request, tag_id: int, db: AsyncSession = Depends(get
     Obtiene un tag por ID con sus posts asociados.
     Acceso público.
     """
-    try:
-        logger.info(f"Obteniendo tag con relaciones: ID={tag_id}")
-        db_tag = await crud_tag.get_tag(db, tag_id=tag_id)
-        if not db_tag:
-            logger.warning(f"Tag no encontrado: ID={tag_id}")
-            raise HTTPException(status_code=404, detail="Etiqueta no encontrada")
-        return db_tag
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error al obtener tag {tag_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al obtener la etiqueta")
+    logger.info(f"Obteniendo tag con relaciones: ID={tag_id}")
+    db_tag = await crud_tag.get_tag_with_posts(db, tag_id=tag_id)
+    if not db_tag:
+        logger.warning(f"Tag no encontrado: ID={tag_id}")
+        raise HTTPException(status_code=404, detail="Etiqueta no encontrada")
+    return db_tag
 
 
 @router.patch("/{tag_id}", response_model=Tag)
@@ -116,36 +95,29 @@ async def update_tag(
     tag_id: int,
     tag: TagUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(crud_user.get_current_active_user),
+    current_user: User = Depends(get_current_active_user),
 ):
     """
     Actualiza un tag. Solo accesible para administradores.
     """
-    try:
-        logger.info(f"Usuario {current_user.id} intenta actualizar tag: ID={tag_id}")
-
-        if not current_user.is_admin:
-            logger.warning(
-                f"Permiso denegado: usuario {current_user.id} intentó editar tag {tag_id}"
-            )
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Solo los administradores pueden editar etiquetas",
-            )
+    logger.info(f"Usuario {current_user.id} intenta actualizar tag: ID={tag_id}")
 
-        db_tag = await crud_tag.update_tag(db, tag_id=tag_id, tag_update=tag)
-        if not db_tag:
-            logger.warning(f"Tag no encontrado para actualizar: ID={tag_id}")
-            raise HTTPException(status_code=404, detail="Etiqueta no encontrada")
+    if not current_user.is_admin:
+        logger.warning(
+            f"Permiso denegado: usuario {current_user.id} intentó editar tag {tag_id}"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Solo los administradores pueden editar etiquetas",
+        )
 
-        logger.info(f"Tag actualizado: ID={tag_id}")
-        return db_tag
+    db_tag = await crud_tag.update_tag(db, tag_id=tag_id, tag_update=tag)
+    if not db_tag:
+        logger.warning(f"Tag no encontrado para actualizar: ID={tag_id}")
+        raise HTTPException(status_code=404, detail="Etiqueta no encontrada")
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error al actualizar tag {tag_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al actualizar la etiqueta")
+    logger.info(f"Tag actualizado: ID={tag_id}")
+    return db_tag
 
 
 @router.delete("/{tag_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -154,34 +126,29 @@ async def delete_tag(
     request: Request,
     tag_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(crud_user.get_current_active_user),
+    current_user: User = Depends(get_current_active_user),
 ):
     """
     Elimina un tag (soft delete). Solo accesible para administradores.
     """
-    try:
-        logger.info(f"Usuario {current_user.id} intenta eliminar tag: ID={tag_id}")
+    logger.info(f"Usuario {current_user.id} intenta eliminar tag: ID={tag_id}")
 
-        if not current_user.is_admin:
-            logger.warning(
-                f"Permiso denegado: usuario {current_user.id} intentó eliminar tag {tag_id}"
-            )
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Solo los administradores pueden eliminar etiquetas",
-            )
-
-        success = await crud_tag.delete_tag(db, tag_id=tag_id)
-        if not success:
-            logger.warning(f"Tag no encontrado para eliminar: ID={tag_id}")
-            raise HTTPException(status_code=404, detail="Etiqueta no encontrada")
+    if not current_user.is_admin:
+        logger.warning(
+            f"Permiso denegado: usuario {current_user.id} intentó eliminar tag {tag_id}"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Solo los administradores pueden eliminar etiquetas",
+        )
 
-        logger.info(f"Tag eliminado (soft): ID={tag_id}")
-        return {"message": "Etiqueta eliminada correctamente"}
+    success = await crud_tag.delete_tag(db, tag_id=tag_id)
+    if not success:
+        logger.warning(f"Tag no encontrado para eliminar: ID={tag_id}")
+        raise HTTPException(status_code=404, detail="Etiqueta no encontrada")
 
-    except Exception as e:
-        logger.error(f"Error al eliminar tag {tag_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al eliminar la etiqueta")
+    logger.info(f"Tag eliminado (soft): ID={tag_id}")
+    return {"message": "Etiqueta eliminada correctamente"}
 
 
 @router.post("/{tag_id}/restore", response_model=Tag)
@@ -190,85 +157,60 @@ async def restore_tag(
     request: Request,
     tag_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(crud_user.get_current_active_user),
+    current_user: User = Depends(get_current_active_user),
 ):
     """
     Restaura un tag eliminado. Solo accesible para administradores.
     """
-    try:
-        logger.info(f"Usuario {current_user.id} intenta restaurar tag: ID={tag_id}")
-
-        if not current_user.is_admin:
-            logger.warning(
-                f"Permiso denegado: usuario {current_user.id} intentó restaurar tag {tag_id}"
-            )
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Solo los administradores pueden restaurar etiquetas",
-            )
+    logger.info(f"Usuario {current_user.id} intenta restaurar tag: ID={tag_id}")
 
-        success = await crud_tag.restore_tag(db, tag_id=tag_id)
-        if not success:
-            logger.warning(f"Tag eliminado no encontrado: ID={tag_id}")
-            raise HTTPException(
-                status_code=404, detail="Etiqueta eliminada no encontrada"
-            )
+    if not current_user.is_admin:
+        logger.warning(
+            f"Permiso denegado: usuario {current_user.id} intentó restaurar tag {tag_id}"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Solo los administradores pueden restaurar etiquetas",
+        )
 
-        db_tag = await crud_tag.get_tag(db, tag_id=tag_id)
-        logger.info(f"Tag restaurado: ID={tag_id}")
-        return db_tag
+    success = await crud_tag.restore_tag(db, tag_id=tag_id)
+    if not success:
+        logger.warning(f"Tag eliminado no encontrado: ID={tag_id}")
+        raise HTTPException(status_code=404, detail="Etiqueta eliminada no encontrada")
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error al restaurar tag {tag_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al restaurar la etiqueta")
+    db_tag = await crud_tag.get_tag(db, tag_id=tag_id)
+    logger.info(f"Tag restaurado: ID={tag_id}")
+    return db_tag
 
 
-@router.get("/deleted/", response_model=PaginatedResponse[Tag])
+@router.get("/deleted/", response_model=list[Tag])
 @limiter.limit("10/minute")
 async def read_deleted_tags(
     request: Request,
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     limit: int = Query(10, ge=1),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(crud_user.get_current_active_user),
+    current_user: User = Depends(get_current_active_user),
 ):
     """
-    Obtiene tags eliminados. Solo accesible para administradores.
+    Obtiene tags eliminados con paginación por cursor (cabecera X-Next-Cursor).
+    Solo accesible para administradores.
     """
-    try:
-        logger.info(f"Usuario {current_user.id} intenta acceder a tags eliminados")
+    logger.info(f"Usuario {current_user.id} intenta acceder a tags eliminados")
 
-        if not current_user.is_admin:
-            logger.warning(
-                f"Acceso denegado a tags eliminados para usuario {current_user.id}"
-            )
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Acceso denegado: solo administradores",
-            )
-
-        db_tags, total = await crud_tag.get_deleted_tags_paginated(
-            db, skip=skip, limit=limit
+    if not current_user.is_admin:
+        logger.warning(
+            f"Acceso denegado a tags eliminados para usuario {current_user.id}"
         )
-        pydantic_tags = [Tag.model_validate(db_tag) for db_tag in db_tags]
-        page = skip // limit + 1 if limit > 0 else 1
-        size = len(pydantic_tags)
-        total_pages = (total + limit - 1) // limit if limit > 0 else 1
-
-        logger.info(f"Tags eliminados obtenidos: {size} de {total} totales")
-        return PaginatedResponse[Tag](
-            items=pydantic_tags,
-            total=total,
-            page=page,
-            size=size,
-            total_pages=total_pages,
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error al obtener tags eliminados: {str(e)}")
         raise HTTPException(
-            status_code=500, detail="Error al obtener etiquetas eliminadas"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acceso denegado: solo administradores",
         )
+
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    tags, next_cursor = await crud_tag.get_deleted_tags(db, after=after, limit=limit)
+    logger.info(f"Tags eliminados obtenidos: {len(tags)}")
+    return cursor_page_response(Tag, tags, next_cursor)
@@ -1,9 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status, Request, Security
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    status,
+    Request,
+    Security,
+)
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.crud import user as crud_user
 from app.crud import post as crud_post
-from app.schemas.common import PaginatedResponse
 from app.schemas.user import User, UserCreate, UserUpdate, UserWithPosts
 from app.schemas.post import Post
 from app.models.user import User as UserModel
@@ -11,6 +19,7 @@ from app.core.security import oauth2_scheme
 from fastapi import Security
 from app.core.deps import get_current_active_user
 from app.core.logging import logger
+from app.core.pagination import cursor_page_response, decode_cursor
 from app.core.deps import require_admin
 from slowapi import Limiter
 from slowapi.util import get_remote_address
@@ -20,40 +29,27 @@ limiter = Limiter(key_func=get_remote_address)
 router = APIRouter(prefix="/users", tags=["users"])
 
 
-@router.get("/", response_model=PaginatedResponse[User])
+@router.get("/", response_model=list[User])
 @limiter.limit("50/minute")
 async def read_users(
     request: Request,
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     limit: int = Query(10, ge=1),
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Obtiene una lista paginada de usuarios activos.
+    Obtiene usuarios activos con paginación por cursor.
+    El cursor de la página siguiente se devuelve en la cabecera X-Next-Cursor.
     Acceso público.
     """
+    logger.info(f"Obteniendo usuarios (cursor={cursor}, limit={limit})")
     try:
-        logger.info(f"Obteniendo usuarios (skip={skip}, limit={limit})")
-        db_users, total = await crud_user.get_users_paginated(
-            db, skip=skip, limit=limit
-        )
-
-        pydantic_users = [User.model_validate(db_user) for db_user in db_users]
-        page = skip // limit + 1 if limit > 0 else 1
-        size = len(pydantic_users)
-        total_pages = (total + limit - 1) // limit if limit > 0 else 1
-
-        logger.info(f"Usuarios obtenidos: {size} de {total} totales")
-        return PaginatedResponse[User](
-            items=pydantic_users,
-            total=total,
-            page=page,
-            size=size,
-            total_pages=total_pages,
-        )
-    except Exception as e:
-        logger.error(f"Error al obtener usuarios paginados: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al obtener usuarios")
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    users, next_cursor = await crud_user.get_users(db, after=after, limit=limit)
+    logger.info(f"Usuarios obtenidos: {len(users)}")
+    return cursor_page_response(User, users, next_cursor)
 
 
 @router.get("/me", response_model=User)
@@ -65,14 +61,10 @@ async def read_user_me(
     Obtiene el perfil del usuario autenticado.
     Requiere autenticación.
     """
-    try:
-        logger.info(
-            f"Acceso a /me por usuario: ID={current_user.id}, username='{current_user.username}'"
-        )
-        return User.model_validate(current_user)
-    except Exception as e:
-        logger.error(f"Error al obtener perfil del usuario {current_user.id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al obtener perfil")
+    logger.info(
+        f"Acceso a /me por usuario: ID={current_user.id}, username='{current_user.username}'"
+    )
+    return User.model_validate(current_user)
 
 
 @router.get("/admin-only")
@@ -82,14 +74,8 @@ async def admin_only(request: Request, admin: UserModel = Depends(require_admin)
     Endpoint de ejemplo para verificar permisos de administrador.
     Solo accesible para administradores.
     """
-    try:
-        logger.info(f"Acceso a /admin-only por administrador: {admin.username}")
-        return {"message": f"Hello {admin.username}, you are an admin!"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error en endpoint admin-only: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error interno")
+    logger.info(f"Acceso a /admin-only por administrador: {admin.username}")
+    return {"message": f"Hello {admin.username}, you are an admin!"}
 
 
 @router.get("/{user_id}", response_model=UserWithPosts)
@@ -99,18 +85,12 @@ async def read_user(request: Request, user_id: int, db: AsyncSession = Depends(g
     Obtiene un usuario por ID con sus posts asociados.
     Acceso público.
     """
-    try:
-        logger.info(f"Obteniendo usuario con relaciones: ID={user_id}")
-        db_user = await crud_user.get_user_with_posts(db, user_id=user_id)
-        if not db_user:
-            logger.warning(f"Usuario no encontrado: ID={user_id}")
-            raise HTTPException(status_code=404, detail="Usuario no encontrado")
-        return UserWithPosts.model_validate(db_user)
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error al obtener usuario {user_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al obtener el usuario")
+    logger.info(f"Obteniendo usuario con relaciones: ID={user_id}")
+    user_with_posts = await crud_user.get_user_with_posts_json(db, user_id=user_id)
+    if not user_with_posts:
+        logger.warning(f"Usuario no encontrado: ID={user_id}")
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    return user_with_posts
 
 
 @router.post("/", response_model=User, status_code=status.HTTP_201_CREATED)
@@ -122,36 +102,16 @@ async def create_user(
     Crea un nuevo usuario. Acceso público.
 
     """
-    try:
-        logger.info(
-            f"Intento de registro: username='{user.username}', email='{user.email}'"
-        )
-
-        db_user = await crud_user.get_user_by_username(db, username=user.username)
-        if db_user:
-            logger.warning(f"Registro fallido: username ya existe '{user.username}'")
-            raise HTTPException(
-                status_code=400, detail="El nombre de usuario ya está registrado"
-            )
-
-        db_user = await crud_user.get_user_by_email(db, email=user.email)
-        if db_user:
-            logger.warning(f"Registro fallido: email ya existe '{user.email}'")
-            raise HTTPException(
-                status_code=400, detail="El correo electrónico ya está registrado"
-            )
-
-        db_user = await crud_user.create_user(db=db, user=user)
-        logger.info(
-            f"Usuario registrado exitosamente: ID={db_user.id}, username='{db_user.username}'"
-        )
-        return User.model_validate(db_user)
+    logger.info(
+        f"Intento de registro: username='{user.username}', email='{user.email}'"
+    )
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error inesperado al crear usuario: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error interno del servidor")
+    # Los duplicados de username/email los rechaza crud_user.create_user
+    db_user = await crud_user.create_user(db=db, user=user)
+    logger.info(
+        f"Usuario registrado exitosamente: ID={db_user.id}, username='{db_user.username}'"
+    )
+    return User.model_validate(db_user)
 
 
 @router.patch("/{user_id}", response_model=User)
@@ -166,48 +126,25 @@ async def update_user(
     """
     Actualiza un usuario. Solo el propio usuario o un admin puede hacerlo.
     """
-    try:
-        logger.info(
-            f"Usuario {current_user.id} intenta actualizar usuario: ID={user_id}"
-        )
-
-        # Verificar permisos
-        if current_user.id != user_id and not current_user.is_admin:
-            logger.warning(
-                f"Permiso denegado: usuario {current_user.id} intentó editar usuario {user_id}"
-            )
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para editar este usuario",
-            )
-
-        # Verificar duplicados si se actualiza username o email
-        if user.username:
-            existing = await crud_user.get_user_by_username(db, username=user.username)
-            if existing and existing.id != user_id:
-                raise HTTPException(
-                    status_code=400, detail="El nombre de usuario ya está en uso"
-                )
-        if user.email:
-            existing = await crud_user.get_user_by_email(db, email=user.email)
-            if existing and existing.id != user_id:
-                raise HTTPException(
-                    status_code=400, detail="El correo electrónico ya está en uso"
-                )
+    logger.info(f"Usuario {current_user.id} intenta actualizar usuario: ID={user_id}")
 
-        db_user = await crud_user.update_user(db, user_id=user_id, user_update=user)
-        if not db_user:
-            logger.warning(f"Usuario no encontrado para actualizar: ID={user_id}")
-            raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    # Verificar permisos
+    if current_user.id != user_id and not current_user.is_admin:
+        logger.warning(
+            f"Permiso denegado: usuario {current_user.id} intentó editar usuario {user_id}"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permiso para editar este usuario",
+        )
 
-        logger.info(f"Usuario actualizado: ID={user_id}")
-        return db_user
+    db_user = await crud_user.update_user(db, user_id=user_id, user_update=user)
+    if not db_user:
+        logger.warning(f"Usuario no encontrado para actualizar: ID={user_id}")
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error al actualizar usuario {user_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al actualizar el usuario")
+    logger.info(f"Usuario actualizado: ID={user_id}")
+    return db_user
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_200_OK)
@@ -221,30 +158,25 @@ async def delete_user(
     """
     Elimina un usuario (soft delete). Solo el propio usuario o un admin puede hacerlo.
     """
-    try:
-        logger.info(f"Usuario {current_user.id} intenta eliminar usuario: ID={user_id}")
-
-        # Verificar permisos
-        if current_user.id != user_id and not current_user.is_admin:
-            logger.warning(
-                f"Permiso denegado: usuario {current_user.id} intentó eliminar usuario {user_id}"
-            )
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="No tienes permiso para eliminar este usuario",
-            )
+    logger.info(f"Usuario {current_user.id} intenta eliminar usuario: ID={user_id}")
 
-        success = await crud_user.delete_user(db, user_id=user_id)
-        if not success:
-            logger.warning(f"Usuario no encontrado para eliminar: ID={user_id}")
-            raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    # Verificar permisos
+    if current_user.id != user_id and not current_user.is_admin:
+        logger.warning(
+            f"Permiso denegado: usuario {current_user.id} intentó eliminar usuario {user_id}"
+        )
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permiso para eliminar este usuario",
+        )
 
-        logger.info(f"Usuario eliminado (soft): ID={user_id}")
-        return {"message": "Usuario eliminado correctamente"}
+    success = await crud_user.delete_user(db, user_id=user_id)
+    if not success:
+        logger.warning(f"Usuario no encontrado para eliminar: ID={user_id}")
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
-    except Exception as e:
-        logger.error(f"Error al eliminar usuario {user_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al eliminar el usuario")
+    logger.info(f"Usuario eliminado (soft): ID={user_id}")
+    return {"message": "Usuario eliminado correctamente"}
 
 
 @router.post("/{user_id}/restore", response_model=User)
@@ -258,25 +190,16 @@ async def restore_user(
     """
     Restaura un usuario eliminado. Solo accesible para administradores.
     """
-    try:
-        logger.info(f"Administrador {admin.id} intenta restaurar usuario: ID={user_id}")
+    logger.info(f"Administrador {admin.id} intenta restaurar usuario: ID={user_id}")
 
-        success = await crud_user.restore_user(db, user_id=user_id)
-        if not success:
-            logger.warning(f"Usuario eliminado no encontrado: ID={user_id}")
-            raise HTTPException(
-                status_code=404, detail="Usuario eliminado no encontrado"
-            )
+    success = await crud_user.restore_user(db, user_id=user_id)
+    if not success:
+        logger.warning(f"Usuario eliminado no encontrado: ID={user_id}")
+        raise HTTPException(status_code=404, detail="Usuario eliminado no encontrado")
 
-        db_user = await crud_user.get_user(db, user_id=user_id)
-        logger.info(f"Usuario restaurado: ID={user_id}")
-        return db_user
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error al restaurar usuario {user_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al restaurar el usuario")
+    db_user = await crud_user.get_user(db, user_id=user_id)
+    logger.info(f"Usuario restaurado: ID={user_id}")
+    return db_user
 
 
 @router.get("/{user_id}/posts", response_model=list[Post])
@@ -284,48 +207,45 @@ async def restore_user(
 async def read_user_posts(
     request: Request,
     user_id: int,
-    skip: int = 0,
-    limit: int = 10,
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1),
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Obtiene los posts de un usuario.
+    Obtiene los posts de un usuario con paginación por cursor.
+    El cursor de la página siguiente se devuelve en la cabecera X-Next-Cursor.
     Acceso público.
     """
+    logger.info(f"Obteniendo posts del usuario: ID={user_id}")
     try:
-        logger.info(f"Obteniendo posts del usuario: ID={user_id}")
-        posts = await crud_post.get_posts_by_user(
-            db, user_id=user_id, skip=skip, limit=limit
-        )
-        return posts
-    except Exception as e:
-        logger.error(f"Error al obtener posts del usuario {user_id}: {str(e)}")
-        raise HTTPException(
-            status_code=500, detail="Error al obtener los posts del usuario"
-        )
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    posts, next_cursor = await crud_post.get_posts_by_user(
+        db, user_id=user_id, after=after, limit=limit
+    )
+    return cursor_page_response(Post, posts, next_cursor)
 
 
 @router.get("/deleted/", response_model=list[User])
 @limiter.limit("10/minute")
 async def read_deleted_users(
     request: Request,
-    skip: int = 0,
-    limit: int = 10,
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1),
     db: AsyncSession = Depends(get_db),
     admin: UserModel = Security(require_admin),
 ):
     """
-    Obtiene usuarios eliminados. Solo accesible para administradores.
+    Obtiene usuarios eliminados con paginación por cursor.
+    El cursor de la página siguiente se devuelve en la cabecera X-Next-Cursor.
+    Solo accesible para administradores.
     """
+    logger.info(f"Administrador {admin.id} intenta acceder a usuarios eliminados")
     try:
-        logger.info(f"Administrador {admin.id} intenta acceder a usuarios eliminados")
-        users = await crud_user.get_deleted_users(db, skip=skip, limit=limit)
-        logger.info(f"Usuarios eliminados obtenidos: {len(users)}")
-        return users
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error al obtener usuarios eliminados: {str(e)}")
-        raise HTTPException(
-            status_code=500, detail="Error al obtener usuarios eliminados"
-        )
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    users, next_cursor = await crud_user.get_deleted_users(db, after=after, limit=limit)
+    logger.info(f"Usuarios eliminados obtenidos: {len(users)}")
+    return cursor_page_response(User, users, next_cursor)
@@ -9,11 +9,21 @@ class Settings(BaseSettings):
 
     # Base de datos
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800  # segundos
+    DB_POOL_TIMEOUT: int = 30  # segundos de espera por una conexión libre
 
     # Seguridad
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Segundos que se reutiliza un token ya validado sin volver a la BD
+    AUTH_CACHE_TTL_SECONDS: int = 30
+    # Coste de bcrypt (2^rounds iteraciones); 12 rondas ~250 ms por hash
+    BCRYPT_ROUNDS: int = 12
+    # Segundos que un login correcto evita repetir la verificación bcrypt
+    LOGIN_CACHE_TTL_SECONDS: int = 60
     
 
     # Define el archivo .env
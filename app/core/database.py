@@ -1,12 +1,34 @@
+import asyncio
+
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, with_loader_criteria
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.models import Base
+from app.models.base import SoftDeleteMixin
 from app.core.config import settings
 
 # Crear motor asíncrono
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=True,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
     pool_pre_ping=True,
+    # LIFO: reutiliza las conexiones más recientes y deja caducar las ociosas
+    pool_use_lifo=True,
+    # Caché de SQL compilado por estructura de sentencia (por defecto 500)
+    query_cache_size=1200,
+    # Filas por lote en los INSERT masivos con RETURNING (insertmanyvalues)
+    insertmanyvalues_page_size=10_000,
+    # Caché de sentencias preparadas por conexión (asyncpg y su adaptador)
+    connect_args={
+        "statement_cache_size": 500,
+        "prepared_statement_cache_size": 500,
+    },
 )
 
 # Crear sessionmaker asíncrono
@@ -17,6 +39,29 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+@event.listens_for(Session, "do_orm_execute")
+def _exclude_soft_deleted(execute_state):
+    """
+    Excluye las filas con borrado lógico de toda SELECT del ORM; el criterio se
+    propaga a las cargas de relaciones (selectinload, joinedload...). Las
+    consultas que necesitan filas eliminadas pasan
+    .execution_options(include_deleted=True).
+    """
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+        and not execute_state.execution_options.get("include_deleted", False)
+    ):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(
+                SoftDeleteMixin,
+                lambda cls: cls.is_deleted == False,
+                include_aliases=True,
+            )
+        )
+
+
 # Dependencia para obtener sesión de DB
 async def get_db():
     async with AsyncSessionLocal() as session:
@@ -24,3 +69,13 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+
+async def warm_up_pool(size: int = settings.DB_POOL_SIZE) -> None:
+    """Abre `size` conexiones en paralelo para que el pool arranque lleno"""
+
+    async def _connect():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(_connect() for _ in range(size)))
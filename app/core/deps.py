@@ -1,12 +1,47 @@
+import hashlib
+import time
+
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.core.database import get_db
 from app.schemas.user import User  # Esquema Pydantic
-from app.core.security import oauth2_scheme
-from app.core.config import settings
-from jose import JWTError, jwt
+from app.core.security import oauth2_scheme, decode_access_token
 from app.models.user import User as UserModel  # Modelo SQLAlchemy
+from app.core.config import settings
+
+# Caché en proceso token -> (usuario, exp): evita decodificar el JWT y
+# consultar la BD en cada petición autenticada con el mismo token.
+# Se indexa por el SHA-256 del token para no guardar el token en claro.
+_auth_cache: TTLCache = TTLCache(maxsize=10_000, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+
+# Índice inverso usuario -> claves de sus tokens en _auth_cache, para invalidar
+# sin recorrer la caché. Usa el mismo TTL y se renueva en cada inserción: al
+# caducar la entrada de un usuario ya han caducado todos sus tokens.
+_user_token_keys: TTLCache = TTLCache(
+    maxsize=10_000, ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+def _cache_user(key: bytes, user: User, exp: float) -> None:
+    """Guarda el usuario de un token y lo registra en el índice inverso"""
+    _auth_cache[key] = (user, exp)
+    # Se descartan las claves que la caché ya ha expulsado o caducado
+    keys = {k for k in _user_token_keys.get(user.id, ()) if k in _auth_cache}
+    keys.add(key)
+    _user_token_keys[user.id] = keys
+
+
+def forget_cached_user(user_id: int) -> None:
+    """Invalida las entradas de caché de un usuario (cambios de datos o baja)"""
+    for key in _user_token_keys.pop(user_id, ()):
+        _auth_cache.pop(key, None)
+
 
 # --- Funciones auxiliares locales para evitar importaciones circulares ---
 
@@ -43,32 +78,37 @@ async def get_current_user(
         detail="No se pudieron validar las credenciales",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-
-        payload: dict = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        # print(f"DEBUG: Payload decodificado: {payload}") # Para depurar
-        sub_value = payload.get("sub")
-        if (
-            not isinstance(sub_value, str) or not sub_value
-        ):  # isinstance maneja el caso None también
-            raise credentials_exception  # o manejar el error como corresponda
-        sub: str = sub_value
-        # sub: str = payload.get("sub") # Anotamos la variable como str
-        # print(f"DEBUG: Valor de 'sub' (username): {sub}") # Para depurar
-        db_user: UserModel | None = await _get_user_by_username(db, sub)
-        # print(f"DEBUG: Usuario encontrado en BD: {db_user}") # Para depurar
-
-        if db_user is None or db_user.is_deleted:
-            raise credentials_exception
-
-        return User.model_validate(db_user)
-
-    except JWTError:
+    key = _token_key(token)
+    cached = _auth_cache.get(key)
+    if cached is not None:
+        user, exp = cached
+        if exp > time.time():
+            return user
+        _auth_cache.pop(key, None)
+
+    payload = decode_access_token(token)
+    if payload is None:
+        raise credentials_exception
 
+    # print(f"DEBUG: Payload decodificado: {payload}") # Para depurar
+    sub_value = payload.get("sub")
+    if (
+        not isinstance(sub_value, str) or not sub_value
+    ):  # isinstance maneja el caso None también
+        raise credentials_exception  # o manejar el error como corresponda
+    sub: str = sub_value
+    # sub: str = payload.get("sub") # Anotamos la variable como str
+    # print(f"DEBUG: Valor de 'sub' (username): {sub}") # Para depurar
+    db_user: UserModel | None = await _get_user_by_username(db, sub)
+    # print(f"DEBUG: Usuario encontrado en BD: {db_user}") # Para depurar
+
+    if db_user is None or db_user.is_deleted:
         raise credentials_exception
-    #
+
+    user = User.model_validate(db_user)
+    # Dos fallos simultáneos solo escriben el mismo valor: no hace falta lock
+    _cache_user(key, user, payload["exp"])
+    return user
 
 
 async def get_current_active_user(
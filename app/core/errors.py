@@ -0,0 +1,37 @@
+import functools
+
+from fastapi import HTTPException
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import logger
+
+
+def handle_db_errors(detail: str):
+    """
+    Decorador para funciones CRUD asíncronas que reciben `db` como primer
+    argumento: deja pasar las HTTPException; los errores de SQLAlchemy deshacen
+    la transacción y se propagan a los manejadores globales, y cualquier otro
+    error deshace la transacción, se registra y se traduce en un HTTP 500 con
+    `detail`.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(db: AsyncSession, *args, **kwargs):
+            try:
+                return await func(db, *args, **kwargs)
+            except HTTPException:
+                raise
+            except SQLAlchemyError:
+                # Los errores de BD los traducen los manejadores globales de main
+                await db.rollback()
+                raise
+            except Exception:
+                await db.rollback()
+                logger.exception("Error en %s", func.__name__)
+                raise HTTPException(status_code=500, detail=detail)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,25 @@
+from itertools import chain
+
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
+
+
+def jsonb_object(*columns):
+    """
+    jsonb_build_object('columna', columna, ...) con el nombre de cada atributo
+    como clave. Las claves van como literales SQL: asyncpg no puede inferir el
+    tipo de parámetros ligados dentro de jsonb_build_object(VARIADIC "any").
+    """
+    return func.jsonb_build_object(
+        *chain.from_iterable((literal_column(f"'{c.key}'"), c) for c in columns),
+        type_=JSONB,
+    )
+
+
+def jsonb_agg_or_empty(expr, *order_by):
+    """jsonb_agg(expr ORDER BY ...) que devuelve '[]' en lugar de NULL sin filas"""
+    if order_by:
+        expr = aggregate_order_by(expr, *order_by)
+    return func.coalesce(
+        func.jsonb_agg(expr), literal_column("'[]'::jsonb"), type_=JSONB
+    )
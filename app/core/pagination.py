@@ -0,0 +1,64 @@
+import base64
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple, Type
+
+from fastapi import Response
+from pydantic import BaseModel
+from sqlalchemy import tuple_
+
+from app.schemas.common import list_adapter
+
+# Cursor para paginación keyset: (valor de ordenación, id) codificado en base64
+Cursor = Tuple[datetime, int]
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    """Codifica la clave (fecha, id) de la última fila como cursor opaco"""
+    raw = f"{sort_value.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Decodifica un cursor; lanza ValueError si el formato no es válido"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        sort_value, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Cursor de paginación inválido") from e
+
+
+def keyset_page(stmt, sort_column, id_column, after: Optional[Cursor], limit: int):
+    """
+    Aplica paginación keyset sobre (sort_column DESC, id_column DESC).
+    Pide una fila extra para saber si existe una página siguiente.
+    """
+    if after is not None:
+        stmt = stmt.where(tuple_(sort_column, id_column) < tuple_(*after))
+    return stmt.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+def split_page(rows: list, limit: int, sort_attr: str) -> Tuple[list, Optional[str]]:
+    """Separa la fila extra y calcula el cursor de la página siguiente"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_attr), last.id)
+
+
+def cursor_page_response(
+    model: Type[BaseModel], items: Sequence[Any], next_cursor: Optional[str]
+) -> Response:
+    """
+    Serializa una página de `items` como List[model] con el TypeAdapter
+    cacheado y añade la cabecera X-Next-Cursor si hay página siguiente.
+    Al devolver la respuesta ya serializada, FastAPI no vuelve a validar
+    cada elemento contra el response_model.
+    """
+    adapter = list_adapter(model)
+    body = adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+    response = Response(content=body, media_type="application/json")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
@@ -1,14 +1,27 @@
+import asyncio
+import hashlib
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
-from jose import JWTError, jwt
+import jwt
 from app.core.config import settings
 from typing import Optional
 from fastapi.security import OAuth2PasswordBearer
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
-# Contexto para hashing de contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Clave y algoritmo JWT resueltos una sola vez al importar el módulo
+_KEY = settings.SECRET_KEY.encode()
+_ALG = settings.ALGORITHM
+
+# Contexto para hashing de contraseñas. El coste es configurable para ajustar
+# la latencia del login sin dejar el hash por debajo de lo recomendado.
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -21,6 +34,66 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+# bcrypt libera el GIL mientras calcula el hash, así que un pool de hilos basta
+# para repartirlo entre núcleos sin bloquear el bucle de eventos (y sin el
+# coste de serializar argumentos hacia otro proceso).
+_HASH_POOL = ThreadPoolExecutor(
+    max_workers=os.cpu_count(), thread_name_prefix="password-hash"
+)
+
+
+async def _run_in_hash_pool(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(_HASH_POOL, func, *args)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Como get_password_hash, pero fuera del bucle de eventos"""
+    return await _run_in_hash_pool(get_password_hash, password)
+
+
+# Hash de referencia para usuarios inexistentes: verificar contra él cuesta lo
+# mismo que una verificación real, así el tiempo de respuesta no revela si el
+# usuario existe. (passlib ya compara el hash en tiempo constante.)
+_DUMMY_HASH = get_password_hash("dummy-password")
+
+
+async def verify_dummy_password(plain_password: str) -> bool:
+    """Realiza una verificación bcrypt completa que siempre falla"""
+    await _run_in_hash_pool(verify_password, plain_password, _DUMMY_HASH)
+    return False
+
+
+# Logins recientes correctos: HMAC(usuario, sha256(contraseña)) -> hash vigente.
+# Un acierto evita repetir bcrypt; si la contraseña cambia, el hash guardado deja
+# de coincidir y la entrada se ignora sin necesidad de invalidarla.
+_login_cache: TTLCache = TTLCache(maxsize=10_000, ttl=settings.LOGIN_CACHE_TTL_SECONDS)
+
+
+def _login_cache_key(username: str, plain_password: str) -> bytes:
+    password_digest = hashlib.sha256(plain_password.encode()).hexdigest()
+    return hmac.new(
+        _KEY, f"{username}:{password_digest}".encode(), hashlib.sha256
+    ).digest()
+
+
+async def verify_password_cached(
+    username: str, plain_password: str, hashed_password: str
+) -> bool:
+    """
+    Como verify_password, pero reutiliza los logins correctos recientes y
+    ejecuta bcrypt en el pool de hashing. La caché solo se toca desde el
+    bucle de eventos.
+    """
+    key = _login_cache_key(username, plain_password)
+    cached = _login_cache.get(key)
+    if cached is not None and hmac.compare_digest(cached, hashed_password):
+        return True
+    if not await _run_in_hash_pool(verify_password, plain_password, hashed_password):
+        return False
+    _login_cache[key] = hashed_password
+    return True
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -30,17 +103,15 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
-    )
+    encoded_jwt = jwt.encode(to_encode, _KEY, algorithm=_ALG)
     return encoded_jwt
 
 
 def decode_access_token(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            token, _KEY, algorithms=[_ALG], options={"require": ["exp"]}
         )
         return payload
-    except JWTError:
+    except jwt.InvalidTokenError:
         return None
@@ -1,117 +1,136 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
-from sqlalchemy import func, and_
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import func, insert, update
 from app.models.comment import Comment
 from app.schemas.comment import CommentCreate, CommentUpdate
+from app.core.errors import handle_db_errors
 from app.core.logging import logger
-from typing import Optional
-from fastapi import HTTPException
+from typing import AsyncIterator, List, Optional
 
 
 async def get_comment(db: AsyncSession, comment_id: int) -> Optional[Comment]:
-    try:
-        result = await db.execute(
-            select(Comment)
-            .options(selectinload(Comment.post))
-            .filter(and_(Comment.id == comment_id, Comment.is_deleted == False))
+    comment = await db.get(Comment, comment_id, options=(selectinload(Comment.post),))
+    if comment is not None and comment.is_deleted:
+        comment = None
+    if not comment:
+        logger.warning("Comentario no encontrado: ID=%s", comment_id)
+    return comment
+
+
+async def get_comment_author_id(db: AsyncSession, comment_id: int) -> Optional[int]:
+    """Devuelve el autor de un comentario activo (para comprobar permisos)"""
+    result = await db.execute(
+        select(Comment.author_id).where(
+            Comment.id == comment_id, Comment.is_deleted == False
         )
-        comment = result.scalar_one_or_none()
-        if not comment:
-            logger.warning(f"Comentario no encontrado: ID={comment_id}")
-        return comment
-    except Exception as e:
-        logger.error(f"Error al obtener comentario {comment_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error interno del servidor")
+    )
+    return result.scalar_one_or_none()
 
 
+@handle_db_errors("Error al crear comentario")
 async def create_comment(
     db: AsyncSession, comment: CommentCreate, post_id: int, author_id: int
 ) -> Comment:
     """
     Crea un nuevo comentario asociado a un post y un autor.
     """
-    try:
-        db_comment = Comment(
-            **comment.model_dump(), post_id=post_id, author_id=author_id
-        )
-        db.add(db_comment)
-        await db.commit()
-        await db.refresh(db_comment)
-        logger.info(
-            f"Comentario creado: ID={db_comment.id}, Post={post_id}, Autor={author_id}"
-        )
-        return db_comment
-
-    except IntegrityError as e:
+    result = await db.execute(
+        insert(Comment)
+        .values(**comment.model_dump(), post_id=post_id, author_id=author_id)
+        .returning(Comment)
+    )
+    db_comment = result.scalar_one()
+    await db.commit()
+    logger.info(
+        "Comentario creado: ID=%s, Post=%s, Autor=%s",
+        db_comment.id,
+        post_id,
+        author_id,
+    )
+    return db_comment
 
-        await db.rollback()
-        logger.error(
-            f"Error de integridad al crear comentario en post {post_id} por autor {author_id}: {str(e)}"
-        )
 
-        raise HTTPException(
-            status_code=400,
-            detail="Error de integridad (el post podría no existir o datos inválidos)",
-        )
-    except Exception as e:
-        await db.rollback()
-        logger.error(
-            f"Error inesperado al crear comentario en post {post_id} por autor {author_id}: {str(e)}"
-        )
-        raise HTTPException(
-            status_code=500, detail="Error interno al crear el comentario"
-        )
+@handle_db_errors("Error al crear comentarios")
+async def create_comments_bulk(
+    db: AsyncSession, comments: List[CommentCreate], post_id: int, author_id: int
+) -> List[Comment]:
+    """
+    Crea varios comentarios de un post en un único INSERT agrupado.
+    """
+    if not comments:
+        return []
+    result = await db.scalars(
+        insert(Comment).returning(Comment),
+        [
+            {**comment.model_dump(), "post_id": post_id, "author_id": author_id}
+            for comment in comments
+        ],
+    )
+    db_comments = result.all()
+    await db.commit()
+    logger.info("Comentarios creados en bloque: %s, Post=%s", len(db_comments), post_id)
+    return db_comments
 
 
 async def update_comment(
     db: AsyncSession, comment_id: int, comment_update: CommentUpdate
 ) -> Optional[Comment]:
-    db_comment = await get_comment(db, comment_id)
+    result = await db.execute(
+        update(Comment)
+        .where(Comment.id == comment_id, Comment.is_deleted == False)
+        .values(**comment_update.model_dump(exclude_unset=True), updated_at=func.now())
+        .returning(Comment)
+        .execution_options(synchronize_session="fetch")
+    )
+    db_comment = result.scalar_one_or_none()
     if not db_comment:
         return None
-    try:
-        update_data = comment_update.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_comment, key, value)
-        db_comment.updated_at = func.now()
-        await db.commit()
-        await db.refresh(db_comment)
-        logger.info(f"Comentario actualizado: ID={comment_id}")
-        return db_comment
-    except Exception as e:
-        await db.rollback()
-        logger.error(f"Error al actualizar comentario {comment_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al actualizar comentario")
+    await db.commit()
+    logger.info("Comentario actualizado: ID=%s", comment_id)
+    return db_comment
 
 
 async def delete_comment(db: AsyncSession, comment_id: int) -> bool:
-    db_comment = await get_comment(db, comment_id)
-    if not db_comment:
+    result = await db.execute(
+        update(Comment)
+        .where(Comment.id == comment_id, Comment.is_deleted == False)
+        .values(is_deleted=True, deleted_at=func.now())
+        .returning(Comment.id)
+    )
+    if result.scalar_one_or_none() is None:
         return False
-    try:
-        db_comment.soft_delete()
-        await db.commit()
-        logger.info(f"Comentario eliminado (soft): ID={comment_id}")
-        return True
-    except Exception as e:
-        await db.rollback()
-        logger.error(f"Error al eliminar comentario {comment_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al eliminar comentario")
+    await db.commit()
+    logger.info("Comentario eliminado (soft): ID=%s", comment_id)
+    return True
 
 
 async def restore_comment(db: AsyncSession, comment_id: int) -> bool:
-    result = await db.execute(select(Comment).filter(Comment.id == comment_id))
-    db_comment = result.scalar_one_or_none()
-    if db_comment and db_comment.is_deleted:
-        try:
-            db_comment.restore()
-            await db.commit()
-            logger.info(f"Comentario restaurado: ID={comment_id}")
-            return True
-        except Exception as e:
-            await db.rollback()
-            logger.error(f"Error al restaurar comentario {comment_id}: {str(e)}")
-            raise HTTPException(status_code=500, detail="Error al restaurar comentario")
-    return False
+    result = await db.execute(
+        update(Comment)
+        .where(Comment.id == comment_id, Comment.is_deleted == True)
+        .values(is_deleted=False, deleted_at=None)
+        .returning(Comment.id)
+    )
+    if result.scalar_one_or_none() is None:
+        return False
+    await db.commit()
+    logger.info("Comentario restaurado: ID=%s", comment_id)
+    return True
+
+
+async def iter_deleted_comments(
+    db: AsyncSession, batch: int = 1000
+) -> AsyncIterator[Comment]:
+    """
+    Itera los comentarios eliminados sin cargarlos todos en memoria: las filas
+    llegan del cursor del servidor en lotes de `batch`.
+    """
+    result = await db.stream(
+        select(Comment)
+        .filter(Comment.is_deleted == True)
+        .execution_options(yield_per=batch, include_deleted=True)
+    )
+    async for partition in result.scalars().partitions():
+        for comment in partition:
+            yield comment
@@ -1,276 +1,387 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
-from sqlalchemy import func, and_
+from sqlalchemy.orm import joinedload, load_only, raiseload, selectinload
+from sqlalchemy import func, and_, delete, exists, insert, literal, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
-from app.models.post import Post
+from app.models.comment import Comment
+from app.models.post import Post, post_tags
 from app.models.tag import Tag
-from app.schemas.post import PostCreate, PostUpdate
+from app.models.user import User
+from app.schemas.post import PostCreate, PostUpdate, PostWithRelations
+from app.core.jsonb import jsonb_agg_or_empty, jsonb_object
 from app.core.logging import logger
-from typing import List, Optional, Tuple
+from app.core.pagination import Cursor, keyset_page, split_page
+from typing import AsyncIterator, List, Optional, Tuple
 from fastapi import HTTPException
 
+# Los errores de base de datos no controlados (SQLAlchemyError) se traducen a
+# respuestas HTTP en los manejadores registrados en app/main.py.
+
+# Relaciones por defecto de un post: el autor (a uno) va en el mismo JOIN y
+# los tags (a muchos) en un SELECT ... IN aparte. Los comentarios solo se
+# cargan en la vista de detalle (get_post_with_comments).
+_POST_OPTIONS = (joinedload(Post.author), selectinload(Post.tags))
+
+# Columnas que expone el esquema Post (lo único que devuelven los listados)
+_LIST_FIELDS = (
+    Post.id,
+    Post.title,
+    Post.content,
+    Post.author_id,
+    Post.created_at,
+    Post.updated_at,
+)
+
+# Opciones de carga para listados: solo esas columnas y ninguna relación
+# (ni el autor ni los tags, que el esquema Post no incluye)
+_LIST_OPTIONS = (load_only(*_LIST_FIELDS), raiseload("*"))
+
+# Igual para posts eliminados; deleted_at hace falta para el cursor keyset
+_DELETED_LIST_OPTIONS = (load_only(*_LIST_FIELDS, Post.deleted_at), raiseload("*"))
+
 
 async def get_post(db: AsyncSession, post_id: int) -> Optional[Post]:
-    try:
-        result = await db.execute(
-            select(Post)
-            .options(
-                selectinload(Post.author),
-                selectinload(Post.comments),
-                selectinload(Post.tags),
-            )
-            .filter(and_(Post.id == post_id, Post.is_deleted == False))
-        )
-        post = result.scalar_one_or_none()
-        if not post:
-            logger.warning(f"Post no encontrado: ID={post_id}")
-        return post
-    except Exception as e:
-        logger.error(f"Error al obtener post {post_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error interno del servidor")
+    """
+    Obtiene un post activo con su autor y sus tags. Session.get() resuelve
+    primero contra el identity map y solo emite SQL si el post no está cargado.
+    """
+    post = await db.get(Post, post_id, options=_POST_OPTIONS)
+    if post is not None and post.is_deleted:
+        post = None
+    if not post:
+        logger.warning("Post no encontrado: ID=%s", post_id)
+    return post
+
+
+async def get_post_author_id(db: AsyncSession, post_id: int) -> Optional[int]:
+    """Devuelve el autor de un post activo (para comprobar permisos) o None"""
+    result = await db.execute(
+        select(Post.author_id).where(Post.id == post_id, Post.is_deleted == False)
+    )
+    return result.scalar_one_or_none()
 
 
-async def get_posts(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Post]:
-    try:
-        result = await db.execute(
-            select(Post)
-            .options(
-                selectinload(Post.author),
-                selectinload(Post.comments),
-                selectinload(Post.tags),
+async def get_post_with_comments(db: AsyncSession, post_id: int) -> Optional[Post]:
+    """Obtiene un post activo con autor, tags y comentarios (vista de detalle)"""
+    # populate_existing: los vínculos post-tag se escriben con SQL directo, así
+    # que una instancia ya cargada en la sesión debe refrescar sus colecciones.
+    result = await db.execute(
+        select(Post)
+        # Todo lo que serializa PostWithRelations va explícito; cualquier otra
+        # relación falla en vez de lanzar una consulta perezosa
+        .options(*_POST_OPTIONS, selectinload(Post.comments), raiseload("*"))
+        .filter(and_(Post.id == post_id, Post.is_deleted == False))
+        .execution_options(populate_existing=True)
+    )
+    post = result.scalar_one_or_none()
+    if not post:
+        logger.warning("Post no encontrado: ID=%s", post_id)
+    return post
+
+
+async def get_post_bundle(
+    db: AsyncSession, post_id: int
+) -> Optional[PostWithRelations]:
+    """
+    Obtiene un post activo con autor, comentarios y tags activos en una sola
+    consulta: PostgreSQL devuelve cada relación ya agregada como JSON
+    (jsonb_build_object / jsonb_agg) y se valida con PostWithRelations.
+    """
+    comments_json = (
+        select(
+            jsonb_agg_or_empty(
+                jsonb_object(
+                    Comment.id,
+                    Comment.content,
+                    Comment.post_id,
+                    Comment.author_id,
+                    Comment.created_at,
+                    Comment.updated_at,
+                ),
+                Comment.created_at,
+            )
+        )
+        .where(Comment.post_id == Post.id, Comment.is_deleted == False)
+        .scalar_subquery()
+    )
+    tags_json = (
+        select(
+            jsonb_agg_or_empty(
+                jsonb_object(Tag.id, Tag.name, Tag.created_at, Tag.updated_at),
+                Tag.name,
             )
-            .filter(Post.is_deleted == False)
-            .offset(skip)
-            .limit(limit)
-            .order_by(Post.created_at.desc())
         )
-        posts = list(result.scalars().all())
-        logger.info(f"Obtenidos {len(posts)} posts (skip={skip}, limit={limit})")
-        return posts
-    except Exception as e:
-        logger.error(f"Error al obtener posts: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al obtener posts")
+        .join(post_tags, post_tags.c.tag_id == Tag.id)
+        .where(post_tags.c.post_id == Post.id, Tag.is_deleted == False)
+        .scalar_subquery()
+    )
+    author_json = jsonb_object(
+        User.id,
+        User.username,
+        User.email,
+        User.full_name,
+        User.is_active,
+        User.is_admin,
+        User.created_at,
+        User.updated_at,
+    )
+    result = await db.execute(
+        select(
+            Post.id,
+            Post.title,
+            Post.content,
+            Post.author_id,
+            Post.created_at,
+            Post.updated_at,
+            author_json.label("author"),
+            comments_json.label("comments"),
+            tags_json.label("tags"),
+        )
+        .join(User, User.id == Post.author_id)
+        .where(Post.id == post_id, Post.is_deleted == False)
+    )
+    row = result.mappings().one_or_none()
+    if row is None:
+        logger.warning("Post no encontrado: ID=%s", post_id)
+        return None
+    return PostWithRelations.model_validate(dict(row))
+
+
+async def get_posts(
+    db: AsyncSession, after: Optional[Cursor] = None, limit: int = 100
+) -> Tuple[List[Post], Optional[str]]:
+    """Lista posts activos con paginación keyset; devuelve (posts, next_cursor)"""
+    stmt = keyset_page(
+        select(Post).options(*_LIST_OPTIONS).filter(Post.is_deleted == False),
+        Post.created_at,
+        Post.id,
+        after,
+        limit,
+    )
+    result = await db.execute(stmt)
+    posts, next_cursor = split_page(result.scalars().all(), limit, "created_at")
+    logger.info("Obtenidos %s posts (after=%s, limit=%s)", len(posts), after, limit)
+    return (posts, next_cursor)
 
 
 async def get_posts_by_user(
-    db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100
-) -> List[Post]:
+    db: AsyncSession, user_id: int, after: Optional[Cursor] = None, limit: int = 100
+) -> Tuple[List[Post], Optional[str]]:
+    """Lista posts activos de un usuario con paginación keyset"""
+    stmt = keyset_page(
+        select(Post)
+        .options(*_LIST_OPTIONS)
+        .filter(and_(Post.author_id == user_id, Post.is_deleted == False)),
+        Post.created_at,
+        Post.id,
+        after,
+        limit,
+    )
+    result = await db.execute(stmt)
+    posts, next_cursor = split_page(result.scalars().all(), limit, "created_at")
+    logger.info("Usuario %s tiene %s posts", user_id, len(posts))
+    return (posts, next_cursor)
+
+
+async def create_post(db: AsyncSession, post: PostCreate, author_id: int) -> Post:
     try:
+        # INSERT ... RETURNING: la fila vuelve en el mismo viaje, sin refresh
         result = await db.execute(
-            select(Post)
-            .options(
-                selectinload(Post.author),
-                selectinload(Post.comments),
-                selectinload(Post.tags),
-            )
-            .filter(and_(Post.author_id == user_id, Post.is_deleted == False))
-            .offset(skip)
-            .limit(limit)
-            .order_by(Post.created_at.desc())
+            insert(Post)
+            .values(**post.model_dump(), author_id=author_id)
+            .returning(Post)
         )
-        posts = list(result.scalars().all())
-        logger.info(f"Usuario {user_id} tiene {len(posts)} posts")
-        return posts
-    except Exception as e:
-        logger.error(f"Error al obtener posts del usuario {user_id}: {str(e)}")
+        db_post = result.scalar_one()
+        await db.commit()
+        logger.info("Post creado: ID=%s, Autor=%s", db_post.id, author_id)
+        return db_post
+    except IntegrityError:
+        await db.rollback()
+        logger.exception("Error de integridad al crear post")
         raise HTTPException(
-            status_code=500, detail="Error al obtener posts del usuario"
+            status_code=400, detail="Error de integridad (relación inválida)"
         )
 
 
-async def create_post(db: AsyncSession, post: PostCreate, author_id: int) -> Post:
+async def create_posts_bulk(
+    db: AsyncSession, posts: List[PostCreate], author_id: int
+) -> List[Post]:
+    """
+    Crea varios posts en una sola transacción. SQLAlchemy agrupa las filas en
+    INSERT ... VALUES (...), (...) RETURNING (insertmanyvalues).
+    """
+    if not posts:
+        return []
     try:
-        db_post = Post(**post.model_dump(), author_id=author_id)
-        db.add(db_post)
+        result = await db.scalars(
+            insert(Post).returning(Post),
+            [{**post.model_dump(), "author_id": author_id} for post in posts],
+        )
+        db_posts = result.all()
         await db.commit()
-        await db.refresh(db_post)
-        logger.info(f"Post creado: ID={db_post.id}, Autor={author_id}")
-        return db_post
-    except IntegrityError as e:
+        logger.info("Posts creados en bloque: %s, Autor=%s", len(db_posts), author_id)
+        return db_posts
+    except IntegrityError:
         await db.rollback()
-        logger.error(f"Error de integridad al crear post: {str(e)}")
+        logger.exception("Error de integridad al crear posts en bloque")
         raise HTTPException(
             status_code=400, detail="Error de integridad (relación inválida)"
         )
-    except Exception as e:
-        await db.rollback()
-        logger.error(f"Error al crear post: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al crear post")
 
 
 async def update_post(
     db: AsyncSession, post_id: int, post_update: PostUpdate
 ) -> Optional[Post]:
-    db_post = await get_post(db, post_id)
+    """Actualiza un post activo con un único UPDATE ... RETURNING"""
+    result = await db.execute(
+        update(Post)
+        .where(Post.id == post_id, Post.is_deleted == False)
+        .values(**post_update.model_dump(exclude_unset=True), updated_at=func.now())
+        .returning(Post)
+        .execution_options(synchronize_session="fetch")
+    )
+    db_post = result.scalar_one_or_none()
     if not db_post:
-        logger.warning(f"Intento de actualizar post no encontrado: ID={post_id}")
+        logger.warning("Intento de actualizar post no encontrado: ID=%s", post_id)
         return None
-    try:
-        update_data = post_update.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_post, key, value)
-        db_post.updated_at = func.now()
-        await db.commit()
-        await db.refresh(db_post)
-        logger.info(f"Post actualizado: ID={post_id}")
-        return db_post
-    except Exception as e:
-        await db.rollback()
-        logger.error(f"Error al actualizar post {post_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al actualizar post")
+    await db.commit()
+    logger.info("Post actualizado: ID=%s", post_id)
+    return db_post
 
 
 async def delete_post(db: AsyncSession, post_id: int) -> bool:
-    db_post = await get_post(db, post_id)
-    if not db_post:
-        logger.warning(f"Intento de eliminar post no encontrado: ID={post_id}")
+    """Elimina un post (soft delete) con un único UPDATE condicional"""
+    result = await db.execute(
+        update(Post)
+        .where(Post.id == post_id, Post.is_deleted == False)
+        .values(is_deleted=True, deleted_at=func.now())
+        .returning(Post.id)
+    )
+    if result.scalar_one_or_none() is None:
+        logger.warning("Intento de eliminar post no encontrado: ID=%s", post_id)
         return False
-    try:
-        db_post.soft_delete()
-        await db.commit()
-        logger.info(f"Post eliminado (soft): ID={post_id}")
-        return True
-    except Exception as e:
-        await db.rollback()
-        logger.error(f"Error al eliminar post {post_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al eliminar post")
+    await db.commit()
+    logger.info("Post eliminado (soft): ID=%s", post_id)
+    return True
 
 
 async def restore_post(db: AsyncSession, post_id: int) -> bool:
-    try:
-        result = await db.execute(select(Post).filter(Post.id == post_id))
-        db_post = result.scalar_one_or_none()
-        if db_post and db_post.is_deleted:
-            db_post.restore()
-            await db.commit()
-            logger.info(f"Post restaurado: ID={post_id}")
-            return True
-        logger.warning(f"No se puede restaurar post: ID={post_id}, ¿ya está activo?")
+    """Restaura un post eliminado con un único UPDATE condicional"""
+    result = await db.execute(
+        update(Post)
+        .where(Post.id == post_id, Post.is_deleted == True)
+        .values(is_deleted=False, deleted_at=None)
+        .returning(Post.id)
+    )
+    if result.scalar_one_or_none() is None:
+        logger.warning("No se puede restaurar post: ID=%s, ¿ya está activo?", post_id)
         return False
-    except Exception as e:
-        await db.rollback()
-        logger.error(f"Error al restaurar post {post_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al restaurar post")
+    await db.commit()
+    logger.info("Post restaurado: ID=%s", post_id)
+    return True
 
 
 async def get_deleted_posts(
-    db: AsyncSession, skip: int = 0, limit: int = 100
-) -> List[Post]:
-    try:
-        result = await db.execute(
-            select(Post)
-            .filter(Post.is_deleted == True)
-            .offset(skip)
-            .limit(limit)
-            .order_by(Post.deleted_at.desc())
-        )
-        posts = list(result.scalars().all())
-        logger.info(f"Obtenidos {len(posts)} posts eliminados")
-        return posts
-    except Exception as e:
-        logger.error(f"Error al obtener posts eliminados: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al obtener posts eliminados")
-
-
-async def get_deleted_posts_paginated(
-    db: AsyncSession, skip: int = 0, limit: int = 100
-) -> Tuple[List[Post], int]:
-    try:
-        result = await db.execute(
-            select(Post)
-            .filter(Post.is_deleted == True)
-            .offset(skip)
-            .limit(limit)
-            .order_by(Post.deleted_at.desc())
-        )
-        posts: List[Post] = list(result.scalars().all())
-
-        count_result = await db.execute(
-            select(func.count()).select_from(Post).filter(Post.is_deleted == True)
-        )
-        total = count_result.scalar_one()
-
-        logger.info(
-            f"Paginación de posts eliminados: {skip}-{skip+limit}, total={total}"
-        )
-        return (posts, total)
-    except Exception as e:
-        logger.error(f"Error en get_deleted_posts_paginated: {e}")
-        return ([], 0)
-
-
-async def get_posts_paginated(
-    db: AsyncSession, skip: int = 0, limit: int = 100
-) -> Tuple[List[Post], int]:
-    try:
-        result = await db.execute(
-            select(Post)
-            .options(
-                selectinload(Post.author),
-                selectinload(Post.comments),
-                selectinload(Post.tags),
-            )
-            .filter(Post.is_deleted == False)
-            .offset(skip)
-            .limit(limit)
-            .order_by(Post.created_at.desc())
-        )
-        posts: List[Post] = list(result.scalars().all())
-
-        count_result = await db.execute(
-            select(func.count()).select_from(Post).filter(Post.is_deleted == False)
+    db: AsyncSession, after: Optional[Cursor] = None, limit: int = 100
+) -> Tuple[List[Post], Optional[str]]:
+    """Lista posts eliminados con paginación keyset sobre (deleted_at, id)"""
+    stmt = keyset_page(
+        select(Post)
+        .options(*_DELETED_LIST_OPTIONS)
+        .filter(Post.is_deleted == True)
+        .execution_options(include_deleted=True),
+        Post.deleted_at,
+        Post.id,
+        after,
+        limit,
+    )
+    result = await db.execute(stmt)
+    posts, next_cursor = split_page(result.scalars().all(), limit, "deleted_at")
+    logger.info("Obtenidos %s posts eliminados", len(posts))
+    return (posts, next_cursor)
+
+
+async def iter_deleted_posts(
+    db: AsyncSession, batch: int = 1000
+) -> AsyncIterator[Post]:
+    """
+    Recorre todos los posts eliminados con un cursor del servidor, de
+    `batch` en `batch` filas (para tareas de purga o exportación).
+    """
+    result = await db.stream(
+        select(Post)
+        .filter(Post.is_deleted == True)
+        .execution_options(yield_per=batch, include_deleted=True)
+    )
+    async for partition in result.scalars().partitions():
+        for post in partition:
+            yield post
+
+
+async def add_tags_to_post(db: AsyncSession, post_id: int, tag_ids: List[int]) -> int:
+    """
+    Asocia varios tags a un post en una sola sentencia
+    (INSERT ... SELECT ... ON CONFLICT DO NOTHING).
+    Solo se vinculan tags activos a un post activo; devuelve cuántos se añadieron.
+    """
+    if not tag_ids:
+        return 0
+    post_is_active = exists().where(Post.id == post_id, Post.is_deleted == False)
+    result = await db.execute(
+        pg_insert(post_tags)
+        .from_select(
+            ["post_id", "tag_id"],
+            select(literal(post_id), Tag.id).where(
+                Tag.id.in_(tag_ids),
+                Tag.is_deleted == False,
+                post_is_active,
+            ),
         )
-        total = count_result.scalar_one()
-
-        logger.info(f"Posts paginados: {skip}-{skip+limit}, total={total}")
-        return (posts, total)
-    except Exception as e:
-        logger.error(f"Error en get_posts_paginated: {e}")
-        return ([], 0)
+        .on_conflict_do_nothing()
+        .returning(post_tags.c.tag_id)
+    )
+    added = len(result.all())
+    await db.commit()
+    logger.info("Tags añadidos al post %s: %s", post_id, added)
+    return added
 
 
 async def add_tag_to_post(db: AsyncSession, post_id: int, tag_id: int) -> bool:
-    db_post = await get_post(db, post_id)
-    result = await db.execute(
-        select(Tag).filter(and_(Tag.id == tag_id, Tag.is_deleted == False))
+    """
+    Asocia un tag a un post. Es idempotente: si ya estaban asociados también
+    devuelve True; False solo si el post o el tag no existen (o están eliminados)
+    """
+    if await add_tags_to_post(db, post_id, [tag_id]):
+        return True
+    already_linked = await db.scalar(
+        select(post_tags.c.tag_id)
+        .join(Tag, Tag.id == post_tags.c.tag_id)
+        .join(Post, Post.id == post_tags.c.post_id)
+        .where(
+            post_tags.c.post_id == post_id,
+            post_tags.c.tag_id == tag_id,
+            Tag.is_deleted == False,
+            Post.is_deleted == False,
+        )
     )
-    db_tag = result.scalar_one_or_none()
-
-    if not db_post:
-        logger.warning(f"Post no encontrado para añadir tag: post_id={post_id}")
-        return False
-    if not db_tag:
-        logger.warning(f"Tag no encontrado o eliminado: tag_id={tag_id}")
-        return False
-
-    try:
-        if db_tag not in db_post.tags:
-            db_post.tags.append(db_tag)
-            await db.commit()
-            logger.info(f"Tag {tag_id} añadido al post {post_id}")
+    if already_linked is not None:
         return True
-    except Exception as e:
-        await db.rollback()
-        logger.error(f"Error al añadir tag {tag_id} al post {post_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al añadir tag")
+    logger.warning(
+        "No se pudo añadir tag %s al post %s (no encontrado)", tag_id, post_id
+    )
+    return False
 
 
 async def remove_tag_from_post(db: AsyncSession, post_id: int, tag_id: int) -> bool:
-    db_post = await get_post(db, post_id)
-    result = await db.execute(select(Tag).filter(Tag.id == tag_id))
-    db_tag = result.scalar_one_or_none()
-
-    if not db_post or not db_tag:
+    """Elimina el vínculo post-tag con un único DELETE; False si no existía"""
+    result = await db.execute(
+        delete(post_tags)
+        .where(post_tags.c.post_id == post_id, post_tags.c.tag_id == tag_id)
+        .returning(post_tags.c.tag_id)
+    )
+    if result.first() is None:
         return False
-
-    try:
-        if db_tag in db_post.tags:
-            db_post.tags.remove(db_tag)
-            await db.commit()
-            logger.info(f"Tag {tag_id} removido del post {post_id}")
-        return True
-    except Exception as e:
-        await db.rollback()
-        logger.error(f"Error al remover tag {tag_id} del post {post_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al remover tag")
+    await db.commit()
+    logger.info("Tag %s removido del post %s", tag_id, post_id)
+    return True
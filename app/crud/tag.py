@@ -1,238 +1,247 @@
+from collections import defaultdict
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
-from sqlalchemy import func, and_
-from sqlalchemy.exc import IntegrityError, DBAPIError
+from sqlalchemy.orm import raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import func, and_, insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from app.models.post import Post, post_tags
 from app.models.tag import Tag
-from app.models.post import Post
 from app.schemas.tag import TagCreate, TagUpdate
+from app.core.errors import handle_db_errors
 from app.core.logging import logger
-from typing import List, Optional, Tuple
+from app.core.pagination import Cursor, keyset_page, split_page
+from typing import AsyncIterator, List, Optional, Tuple
 from fastapi import HTTPException
 
 
+@handle_db_errors("Error interno del servidor")
 async def get_tag(db: AsyncSession, tag_id: int) -> Optional[Tag]:
-    """Obtiene un tag por ID con sus posts asociados"""
-    try:
-        result = await db.execute(
-            select(Tag)
-            .options(selectinload(Tag.posts))
-            .filter(and_(Tag.id == tag_id, Tag.is_deleted == False))
+    """Obtiene un tag activo por ID (sin cargar sus posts)"""
+    tag = await db.get(Tag, tag_id)
+    if tag is not None and tag.is_deleted:
+        tag = None
+    if not tag:
+        logger.warning("Tag no encontrado: ID=%s", tag_id)
+    return tag
+
+
+@handle_db_errors("Error interno del servidor")
+async def get_tag_with_posts(db: AsyncSession, tag_id: int) -> Optional[Tag]:
+    """Obtiene un tag activo por ID con sus posts asociados"""
+    result = await db.execute(
+        select(Tag)
+        # TagWithPosts solo expone columnas del post: ninguna relación del
+        # post ni del tag debe cargarse (y acceder a ellas falla)
+        .options(selectinload(Tag.posts).raiseload("*"), raiseload("*")).filter(
+            and_(Tag.id == tag_id, Tag.is_deleted == False)
         )
-        tag = result.scalar_one_or_none()
-        if not tag:
-            logger.warning(f"Tag no encontrado: ID={tag_id}")
-        return tag
-    except Exception as e:
-        logger.error(f"Error al obtener tag {tag_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error interno del servidor")
+    )
+    tag = result.scalar_one_or_none()
+    if not tag:
+        logger.warning("Tag no encontrado: ID=%s", tag_id)
+    return tag
 
 
+@handle_db_errors("Error al buscar tag")
 async def get_tag_by_name(db: AsyncSession, name: str) -> Optional[Tag]:
     """Obtiene un tag por nombre (case-insensitive)"""
-    try:
-        result = await db.execute(
-            select(Tag).filter(
-                and_(func.lower(Tag.name) == name.lower(), Tag.is_deleted == False)
-            )
+    result = await db.execute(
+        select(Tag).filter(
+            and_(func.lower(Tag.name) == name.lower(), Tag.is_deleted == False)
         )
-        return result.scalar_one_or_none()
-    except Exception as e:
-        logger.error(f"Error al buscar tag por nombre '{name}': {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al buscar tag")
-
-
-async def get_tags(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Tag]:
-    """Obtiene una lista de tags activos"""
-    try:
-        result = await db.execute(
-            select(Tag)
-            .options(selectinload(Tag.posts))
-            .filter(Tag.is_deleted == False)
-            .offset(skip)
-            .limit(limit)
-            .order_by(Tag.created_at.desc())
-        )
-        tags = list(result.scalars().all())
-        logger.info(f"Obtenidos {len(tags)} tags (skip={skip}, limit={limit})")
-        return tags
-    except Exception as e:
-        logger.error(f"Error al obtener tags: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al obtener tags")
-
-
+    )
+    return result.scalar_one_or_none()
+
+
+async def _load_posts(db: AsyncSession, tags: List[Tag]) -> None:
+    """Carga en un único SELECT ... IN los posts activos de un lote de tags"""
+    result = await db.execute(
+        select(post_tags.c.tag_id, Post)
+        .join(post_tags, post_tags.c.post_id == Post.id)
+        .where(post_tags.c.tag_id.in_([tag.id for tag in tags]))
+        .options(raiseload("*"))
+    )
+    posts_by_tag = defaultdict(list)
+    for tag_id, post in result:
+        posts_by_tag[tag_id].append(post)
+    for tag in tags:
+        set_committed_value(tag, "posts", posts_by_tag[tag.id])
+
+
+@handle_db_errors("Error al obtener tags")
+async def get_tags(
+    db: AsyncSession,
+    after: Optional[Cursor] = None,
+    limit: int = 100,
+    include_posts: bool = False,
+) -> Tuple[List[Tag], Optional[str]]:
+    """
+    Obtiene una lista de tags activos con paginación keyset.
+    Los posts de cada tag solo se cargan con include_posts=True.
+    """
+    stmt = keyset_page(
+        select(Tag).filter(Tag.is_deleted == False).options(raiseload("*")),
+        Tag.created_at,
+        Tag.id,
+        after,
+        limit,
+    )
+    if include_posts:
+        # Con posts, se recorre la página con un cursor del servidor en
+        # lotes de 100 tags: cada lote lanza su propio SELECT ... IN de
+        # posts, en vez de un único IN con todos los tags de la página.
+        # (selectinload no sirve aquí: su consulta hereda yield_per y la
+        # carga many-to-many no admite yield_per)
+        result = await db.stream(stmt.execution_options(yield_per=100))
+        rows = []
+        async for batch in result.scalars().partitions():
+            await _load_posts(db, batch)
+            rows.extend(batch)
+    else:
+        rows = (await db.execute(stmt)).scalars().all()
+    tags, next_cursor = split_page(rows, limit, "created_at")
+    logger.info("Obtenidos %s tags (after=%s, limit=%s)", len(tags), after, limit)
+    return (tags, next_cursor)
+
+
+@handle_db_errors("Error al crear tag")
 async def create_tag(db: AsyncSession, tag: TagCreate) -> Tag:
     """Crea un nuevo tag"""
     try:
-        # Evitar duplicados (case-insensitive)
-        existing = await get_tag_by_name(db, tag.name)
-        if existing:
+        # La unicidad (case-insensitive) la garantiza el índice único parcial
+        # ix_tag_name_lower_active: un duplicado no inserta ni devuelve fila.
+        result = await db.execute(
+            pg_insert(Tag)
+            .values(**tag.model_dump())
+            .on_conflict_do_nothing()
+            .returning(Tag)
+        )
+        db_tag = result.scalar_one_or_none()
+        if db_tag is None:
+            await db.rollback()
             raise HTTPException(status_code=400, detail="El nombre del tag ya existe")
-
-        db_tag = Tag(**tag.model_dump())
-        db.add(db_tag)
         await db.commit()
-        await db.refresh(db_tag)
-        logger.info(f"Tag creado: ID={db_tag.id}, Nombre='{db_tag.name}'")
+        logger.info("Tag creado: ID=%s, Nombre='%s'", db_tag.id, db_tag.name)
         return db_tag
     except IntegrityError as e:
         await db.rollback()
-        logger.error(f"Error de integridad al crear tag: {str(e)}")
+        logger.error("Error de integridad al crear tag: %s", e)
         raise HTTPException(status_code=400, detail="Error de integridad al crear tag")
-    except HTTPException:
-        raise
-    except Exception as e:
+
+
+@handle_db_errors("Error al crear tags")
+async def create_tags_bulk(db: AsyncSession, tags: List[TagCreate]) -> List[Tag]:
+    """Crea varios tags en un único INSERT agrupado"""
+    if not tags:
+        return []
+    try:
+        result = await db.scalars(
+            insert(Tag).returning(Tag), [tag.model_dump() for tag in tags]
+        )
+        db_tags = result.all()
+        await db.commit()
+        logger.info("Tags creados en bloque: %s", len(db_tags))
+        return db_tags
+    except IntegrityError as e:
         await db.rollback()
-        logger.error(f"Error inesperado al crear tag: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al crear tag")
+        logger.error("Error de integridad al crear tags en bloque: %s", e)
+        raise HTTPException(
+            status_code=400, detail="Error de integridad (nombre de tag duplicado)"
+        )
 
 
+@handle_db_errors("Error al actualizar tag")
 async def update_tag(
     db: AsyncSession, tag_id: int, tag_update: TagUpdate
 ) -> Optional[Tag]:
-    """Actualiza un tag existente"""
-    db_tag = await get_tag(db, tag_id)
-    if not db_tag:
-        logger.warning(f"Intento de actualizar tag no encontrado: ID={tag_id}")
-        return None
-
+    """Actualiza un tag existente con un único UPDATE ... RETURNING"""
     try:
-        # Si se cambia el nombre, verificar que no exista otro tag con ese nombre
-        if tag_update.name and tag_update.name != db_tag.name:
-            existing = await get_tag_by_name(db, tag_update.name)
-            if existing:
-                raise HTTPException(
-                    status_code=400, detail="El nombre del tag ya existe"
-                )
-
-        update_data = tag_update.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_tag, key, value)
-        db_tag.updated_at = func.now()
+        # Un nombre repetido lo rechaza el índice único ix_tag_name_lower_active
+        result = await db.execute(
+            update(Tag)
+            .where(Tag.id == tag_id, Tag.is_deleted == False)
+            .values(**tag_update.model_dump(exclude_unset=True), updated_at=func.now())
+            .returning(Tag)
+            .execution_options(synchronize_session="fetch")
+        )
+        db_tag = result.scalar_one_or_none()
+        if not db_tag:
+            logger.warning("Intento de actualizar tag no encontrado: ID=%s", tag_id)
+            return None
 
         await db.commit()
-        await db.refresh(db_tag)
-        logger.info(f"Tag actualizado: ID={tag_id}")
+        logger.info("Tag actualizado: ID=%s", tag_id)
         return db_tag
     except IntegrityError as e:
         await db.rollback()
-        logger.error(f"Error de integridad al actualizar tag {tag_id}: {str(e)}")
-        raise HTTPException(status_code=400, detail="Error de integridad")
-    except HTTPException:
-        raise
-    except Exception as e:
-        await db.rollback()
-        logger.error(f"Error al actualizar tag {tag_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al actualizar tag")
+        logger.error("Error de integridad al actualizar tag %s: %s", tag_id, e)
+        raise HTTPException(status_code=400, detail="El nombre del tag ya existe")
 
 
+@handle_db_errors("Error al eliminar tag")
 async def delete_tag(db: AsyncSession, tag_id: int) -> bool:
-    """Elimina un tag (soft delete)"""
-    db_tag = await get_tag(db, tag_id)
-    if not db_tag:
-        logger.warning(f"Intento de eliminar tag no encontrado: ID={tag_id}")
+    """Elimina un tag (soft delete) con un único UPDATE condicional"""
+    result = await db.execute(
+        update(Tag)
+        .where(Tag.id == tag_id, Tag.is_deleted == False)
+        .values(is_deleted=True, deleted_at=func.now())
+        .returning(Tag.id)
+    )
+    if result.scalar_one_or_none() is None:
+        logger.warning("Intento de eliminar tag no encontrado: ID=%s", tag_id)
         return False
-
-    try:
-        db_tag.soft_delete()
-        await db.commit()
-        logger.info(f"Tag eliminado (soft): ID={tag_id}")
-        return True
-    except Exception as e:
-        await db.rollback()
-        logger.error(f"Error al eliminar tag {tag_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al eliminar tag")
+    await db.commit()
+    logger.info("Tag eliminado (soft): ID=%s", tag_id)
+    return True
 
 
+@handle_db_errors("Error al restaurar tag")
 async def restore_tag(db: AsyncSession, tag_id: int) -> bool:
-    """Restaura un tag eliminado"""
-    try:
-        result = await db.execute(select(Tag).filter(Tag.id == tag_id))
-        db_tag = result.scalar_one_or_none()
-        if not db_tag:
-            logger.warning(f"Intento de restaurar tag no encontrado: ID={tag_id}")
-            return False
-        if not db_tag.is_deleted:
-            logger.info(f"Tag ya está activo: ID={tag_id}")
-            return True
-
-        db_tag.restore()
-        await db.commit()
-        logger.info(f"Tag restaurado: ID={tag_id}")
-        return True
-    except Exception as e:
-        await db.rollback()
-        logger.error(f"Error al restaurar tag {tag_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al restaurar tag")
+    """Restaura un tag eliminado con un único UPDATE condicional"""
+    result = await db.execute(
+        update(Tag)
+        .where(Tag.id == tag_id, Tag.is_deleted == True)
+        .values(is_deleted=False, deleted_at=None)
+        .returning(Tag.id)
+    )
+    if result.scalar_one_or_none() is None:
+        logger.warning("Tag eliminado no encontrado: ID=%s", tag_id)
+        return False
+    await db.commit()
+    logger.info("Tag restaurado: ID=%s", tag_id)
+    return True
 
 
+@handle_db_errors("Error al obtener tags eliminados")
 async def get_deleted_tags(
-    db: AsyncSession, skip: int = 0, limit: int = 100
-) -> List[Tag]:
-    """Obtiene tags eliminados"""
-    try:
-        result = await db.execute(
-            select(Tag)
-            .filter(Tag.is_deleted == True)
-            .offset(skip)
-            .limit(limit)
-            .order_by(Tag.deleted_at.desc())
-        )
-        tags = list(result.scalars().all())
-        logger.info(f"Obtenidos {len(tags)} tags eliminados")
-        return tags
-    except Exception as e:
-        logger.error(f"Error al obtener tags eliminados: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al obtener tags eliminados")
-
-
-async def get_tags_paginated(
-    db: AsyncSession, skip: int = 0, limit: int = 100
-) -> Tuple[List[Tag], int]:
-    """Obtiene una lista paginada de tags activos"""
-    try:
-        result = await db.execute(
-            select(Tag)
-            .filter(Tag.is_deleted == False)
-            .offset(skip)
-            .limit(limit)
-            .order_by(Tag.created_at.desc())
-        )
-        tags: List[Tag] = list(result.scalars().all())
-
-        count_result = await db.execute(
-            select(func.count()).select_from(Tag).filter(Tag.is_deleted == False)
-        )
-        total = count_result.scalar_one()
-
-        logger.info(f"Tags paginados: {skip}-{skip+limit}, total={total}")
-        return (tags, total)
-    except Exception as e:
-        logger.error(f"Error en get_tags_paginated: {e}")
-        return ([], 0)
-
-
-async def get_deleted_tags_paginated(
-    db: AsyncSession, skip: int = 0, limit: int = 100
-) -> Tuple[List[Tag], int]:
-    """Obtiene una lista paginada de tags eliminados"""
-    try:
-        result = await db.execute(
-            select(Tag)
-            .filter(Tag.is_deleted == True)
-            .offset(skip)
-            .limit(limit)
-            .order_by(Tag.deleted_at.desc())
-        )
-        tags: List[Tag] = list(result.scalars().all())
-
-        count_result = await db.execute(
-            select(func.count()).select_from(Tag).filter(Tag.is_deleted == True)
-        )
-        total = count_result.scalar_one()
-
-        logger.info(f"Tags eliminados paginados: {skip}-{skip+limit}, total={total}")
-        return (tags, total)
-    except Exception as e:
-        logger.error(f"Error en get_deleted_tags_paginated: {e}")
-        return ([], 0)
+    db: AsyncSession, after: Optional[Cursor] = None, limit: int = 100
+) -> Tuple[List[Tag], Optional[str]]:
+    """Obtiene tags eliminados con paginación keyset sobre (deleted_at, id)"""
+    stmt = keyset_page(
+        select(Tag)
+        .filter(Tag.is_deleted == True)
+        .execution_options(include_deleted=True),
+        Tag.deleted_at,
+        Tag.id,
+        after,
+        limit,
+    )
+    result = await db.execute(stmt)
+    tags, next_cursor = split_page(result.scalars().all(), limit, "deleted_at")
+    logger.info("Obtenidos %s tags eliminados", len(tags))
+    return (tags, next_cursor)
+
+
+async def iter_deleted_tags(db: AsyncSession, batch: int = 1000) -> AsyncIterator[Tag]:
+    """Itera los tags eliminados en lotes de `batch` filas (cursor del servidor)"""
+    result = await db.stream(
+        select(Tag)
+        .filter(Tag.is_deleted == True)
+        .execution_options(yield_per=batch, include_deleted=True)
+    )
+    async for partition in result.scalars().partitions():
+        for tag in partition:
+            yield tag
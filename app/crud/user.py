@@ -1,103 +1,166 @@
-from fastapi import Depends, HTTPException, status
+import asyncio
+from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import and_, func
+from sqlalchemy import bindparam, exists, func, insert, or_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import IntegrityError
-from app.core.database import get_db
-from app.core.deps import get_current_user
+from app.core.deps import forget_cached_user
+from app.core.errors import handle_db_errors
+from app.core.jsonb import jsonb_agg_or_empty, jsonb_object
 from app.models.user import User
 from app.models.post import Post
-from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash, verify_password
+from app.schemas.user import UserCreate, UserUpdate, UserWithPosts
+from app.core.security import (
+    get_password_hash_async,
+    verify_dummy_password,
+    verify_password_cached,
+)
 from app.core.logging import logger
+from app.core.pagination import Cursor, keyset_page, split_page
 from typing import List, Optional, Tuple
-from sqlalchemy.orm import selectinload
-
-
+from sqlalchemy.orm import aliased, raiseload, selectinload
+
+
+# Columnas que exponen los listados (esquema User): sin hashed_password ni bio
+_LIST_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.full_name,
+    User.is_active,
+    User.is_admin,
+    User.created_at,
+    User.updated_at,
+)
+
+# Sentencias construidas una sola vez al importar el módulo; cada llamada solo
+# pasa los valores de los parámetros ligados
+_GET_USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+_GET_ACTIVE_USER_BY_EMAIL = select(User).where(
+    func.lower(User.email) == bindparam("email"), User.is_deleted == False
+)
+# Login: solo las columnas que necesitan la verificación y el token, como fila
+# Core (sin hidratar ni registrar un objeto User en la sesión)
+_AUTH_USER = select(
+    User.id, User.username, User.hashed_password, User.is_active, User.is_deleted
+).where(User.username == bindparam("username"))
+
+
+@handle_db_errors("Error interno del servidor")
 async def get_user(db: AsyncSession, user_id: int) -> Optional[User]:
     """Obtiene un usuario por ID (incluye eliminados)"""
-    try:
-        result = await db.execute(select(User).filter(User.id == user_id))
-        return result.scalar_one_or_none()
-    except Exception as e:
-        logger.error(f"Error al obtener usuario por ID {user_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error interno del servidor")
+    # Busca primero en el identity map de la sesión; solo consulta si no está
+    return await db.get(User, user_id, execution_options={"include_deleted": True})
 
 
+@handle_db_errors("Error interno del servidor")
 async def get_user_with_posts(db: AsyncSession, user_id: int) -> Optional[User]:
     """
     Obtiene un usuario con sus posts, comentarios y tags cargados.
     """
-    try:
-        logger.info(f"Obteniendo usuario con posts: ID={user_id}")
-        result = await db.execute(
-            select(User)
-            .options(
-                selectinload(User.posts).selectinload(
-                    Post.comments
-                ),  # ← Carga comentarios
-                selectinload(User.posts).selectinload(Post.tags),  # ← Carga tags
+    logger.info("Obteniendo usuario con posts: ID=%s", user_id)
+    result = await db.execute(
+        select(User)
+        .options(
+            selectinload(User.posts).selectinload(Post.comments),  # ← Carga comentarios
+            selectinload(User.posts).selectinload(Post.tags),  # ← Carga tags
+            # Cualquier otra relación (User.comments, Post.author...) falla
+            # al acceder en vez de lanzar una consulta perezosa
+            raiseload("*"),
+        )
+        .filter(User.id == user_id, User.is_deleted == False)
+    )
+    user = result.scalar_one_or_none()
+    if not user:
+        logger.warning("Usuario no encontrado: ID=%s", user_id)
+    return user
+
+
+@handle_db_errors("Error interno del servidor")
+async def get_user_with_posts_json(
+    db: AsyncSession, user_id: int
+) -> Optional[UserWithPosts]:
+    """
+    Obtiene un usuario activo y sus posts activos en una sola consulta: los
+    posts llegan ya agregados como JSON (jsonb_agg) y se validan directamente
+    con el esquema UserWithPosts, sin pasar por objetos ORM.
+    """
+    posts_json = (
+        select(
+            jsonb_agg_or_empty(
+                jsonb_object(
+                    Post.id,
+                    Post.title,
+                    Post.content,
+                    Post.author_id,
+                    Post.created_at,
+                    Post.updated_at,
+                ),
+                Post.created_at.desc(),
             )
-            .filter(User.id == user_id, User.is_deleted == False)
         )
-        user = result.scalar_one_or_none()
-        if not user:
-            logger.warning(f"Usuario no encontrado: ID={user_id}")
-        return user
-    except Exception as e:
-        logger.error(f"Error al obtener usuario con posts {user_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error interno del servidor")
+        .where(Post.author_id == User.id, Post.is_deleted == False)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(
+            User.id,
+            User.username,
+            User.email,
+            User.full_name,
+            User.is_active,
+            User.is_admin,
+            User.created_at,
+            User.updated_at,
+            posts_json.label("posts"),
+        ).where(User.id == user_id, User.is_deleted == False)
+    )
+    row = result.mappings().one_or_none()
+    if row is None:
+        logger.warning("Usuario no encontrado: ID=%s", user_id)
+        return None
+    return UserWithPosts.model_validate(dict(row))
 
 
+@handle_db_errors("Error interno del servidor")
 async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
     """Obtiene un usuario por nombre de usuario"""
-    try:
-        result = await db.execute(select(User).filter(User.username == username))
-        return result.scalar_one_or_none()
-    except Exception as e:
-        logger.error(f"Error al obtener usuario por username '{username}': {str(e)}")
-        raise HTTPException(status_code=500, detail="Error interno del servidor")
+    result = await db.execute(_GET_USER_BY_USERNAME, {"username": username})
+    return result.scalar_one_or_none()
 
 
+@handle_db_errors("Error interno del servidor")
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     """Obtiene un usuario activo por email"""
-    try:
-        result = await db.execute(
-            select(User).filter(and_(User.email == email, User.is_deleted == False))
-        )
-        user = result.scalar_one_or_none()
-        if not user:
-            logger.info(f"Usuario no encontrado por email: {email}")
-        return user
-    except Exception as e:
-        logger.error(f"Error al obtener usuario por email '{email}': {str(e)}")
-        raise HTTPException(status_code=500, detail="Error interno del servidor")
-
-
-async def get_users_paginated(
-    db: AsyncSession, skip: int = 0, limit: int = 100
-) -> Tuple[List[User], int]:
-    """Obtiene una lista paginada de usuarios activos"""
-    try:
-        result = await db.execute(
-            select(User)
-            .filter(User.is_deleted == False)
-            .offset(skip)
-            .limit(limit)
-            .order_by(User.created_at.desc())
-        )
-        users: List[User] = list(result.scalars().all())
+    result = await db.execute(_GET_ACTIVE_USER_BY_EMAIL, {"email": email.lower()})
+    user = result.scalar_one_or_none()
+    if not user:
+        logger.info("Usuario no encontrado por email: %s", email)
+    return user
 
-        count_result = await db.execute(
-            select(func.count()).select_from(User).filter(User.is_deleted == False)
-        )
-        total = count_result.scalar_one()
 
-        logger.info(f"Usuarios paginados: {skip}-{skip+limit}, total={total}")
-        return (users, total)
-    except Exception as e:
-        logger.error(f"Error en get_users_paginated: {e}")
-        return ([], 0)
+@handle_db_errors("Error al obtener usuarios")
+async def get_users(
+    db: AsyncSession, after: Optional[Cursor] = None, limit: int = 100
+) -> Tuple[List[Row], Optional[str]]:
+    """
+    Lista usuarios activos con paginación keyset sobre (created_at, id);
+    devuelve (filas, next_cursor). Las filas llevan solo las columnas de
+    _LIST_COLUMNS y el coste no crece con la profundidad de la página.
+    """
+    stmt = keyset_page(
+        select(*_LIST_COLUMNS).filter(User.is_deleted == False),
+        User.created_at,
+        User.id,
+        after,
+        limit,
+    )
+    result = await db.execute(stmt)
+    users, next_cursor = split_page(result.all(), limit, "created_at")
+    logger.info("Obtenidos %s usuarios (after=%s, limit=%s)", len(users), after, limit)
+    return (users, next_cursor)
 
 
 # ========================
@@ -105,31 +168,31 @@ async def get_users_paginated(
 # ========================
 
 
+@handle_db_errors("Error al autenticar usuario")
 async def authenticate_user(
     db: AsyncSession, username: str, password: str
-) -> Optional[User]:
-    """Autentica un usuario verificando su contraseña"""
-    try:
-        user = await get_user_by_username(db, username=username)
-        if not user:
-            logger.info(
-                f"Intento de autenticación fallida: usuario '{username}' no encontrado"
-            )
-            return None
-        if not verify_password(password, user.hashed_password):
-            logger.info(
-                f"Intento de autenticación fallida: contraseña incorrecta para '{username}'"
-            )
-            return None
-        if user.is_deleted:
-            logger.warning(
-                f"Intento de autenticación con usuario eliminado: {username}"
-            )
-            return None
-        return user
-    except Exception as e:
-        logger.error(f"Error al autenticar usuario '{username}': {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al autenticar usuario")
+) -> Optional[Row]:
+    """
+    Autentica un usuario verificando su contraseña. Devuelve una fila ligera
+    (id, username, hashed_password, is_active, is_deleted) o None.
+    """
+    user = (await db.execute(_AUTH_USER, {"username": username})).one_or_none()
+    if not user:
+        await verify_dummy_password(password)
+        logger.info(
+            "Intento de autenticación fallida: usuario '%s' no encontrado", username
+        )
+        return None
+    if not await verify_password_cached(username, password, user.hashed_password):
+        logger.info(
+            "Intento de autenticación fallida: contraseña incorrecta para '%s'",
+            username,
+        )
+        return None
+    if user.is_deleted:
+        logger.warning("Intento de autenticación con usuario eliminado: %s", username)
+        return None
+    return user
 
 
 # ========================
@@ -137,165 +200,290 @@ async def authenticate_user(
 # ========================
 
 
+async def _find_duplicate_field(
+    db: AsyncSession,
+    email: Optional[str],
+    username: Optional[str],
+) -> Optional[str]:
+    """
+    Indica qué campo único ("email" o "username") ya usa otro usuario, sin
+    distinguir mayúsculas. Solo se llama tras un INSERT rechazado, para
+    elegir el mensaje.
+    """
+    conditions = []
+    if email is not None:
+        conditions.append(func.lower(User.email) == email.lower())
+    if username is not None:
+        conditions.append(func.lower(User.username) == username.lower())
+    if not conditions:
+        return None
+    # Solo chocan los usuarios activos (índices únicos parciales)
+    stmt = select(User.email, User.username).where(or_(*conditions))
+    rows = (await db.execute(stmt)).all()
+    if email is not None and any(row.email.lower() == email.lower() for row in rows):
+        return "email"
+    if username is not None and any(
+        row.username.lower() == username.lower() for row in rows
+    ):
+        return "username"
+    return None
+
+
+# Índices únicos de users -> campo que protegen (para traducir IntegrityError)
+_UNIQUE_INDEX_FIELDS = {
+    "ux_users_email_active": "email",
+    "ux_users_username_active": "username",
+}
+
+
+def _violated_field(error: IntegrityError) -> Optional[str]:
+    """Campo cuyo índice único rechazó la escritura (asyncpg: constraint_name)"""
+    orig = error.orig
+    name = getattr(orig, "constraint_name", None) or getattr(
+        orig.__cause__, "constraint_name", None
+    )
+    return _UNIQUE_INDEX_FIELDS.get(name)
+
+
+@handle_db_errors("Error al crear usuario")
 async def create_user(db: AsyncSession, user: UserCreate) -> User:
-    """Crea un nuevo usuario"""
-    try:
-        # Verificar duplicados
-        if await get_user_by_email(db, user.email):
-            raise HTTPException(status_code=400, detail="El email ya está registrado")
-        if await get_user_by_username(db, user.username):
+    """
+    Crea un nuevo usuario con un único INSERT ... ON CONFLICT DO NOTHING.
+    Si el email o el username ya existen no se inserta ninguna fila.
+    """
+    user_data = user.model_dump(exclude={"password"})
+    hashed_password = await get_password_hash_async(user.password)
+
+    result = await db.execute(
+        pg_insert(User)
+        .values(**user_data, hashed_password=hashed_password)
+        .on_conflict_do_nothing()
+        .returning(User)
+    )
+    db_user = result.scalar_one_or_none()
+    if db_user is None:
+        field = await _find_duplicate_field(db, user.email, user.username)
+        await db.rollback()
+        if field == "email":
             raise HTTPException(
-                status_code=400, detail="El nombre de usuario ya está en uso"
+                status_code=400, detail="El correo electrónico ya está registrado"
             )
+        if field == "username":
+            raise HTTPException(
+                status_code=400, detail="El nombre de usuario ya está registrado"
+            )
+        # La fila en conflicto ya no existe (p. ej. otra transacción que
+        # insertó el mismo usuario hizo rollback): no se sabe qué campo chocó
+        raise HTTPException(
+            status_code=400, detail="Error de integridad en la base de datos"
+        )
+    await db.commit()
 
-        user_data = user.model_dump(exclude={"password"})
-        hashed_password = get_password_hash(user.password)
-        db_user = User(**user_data, hashed_password=hashed_password)
+    logger.info(
+        "Usuario creado: ID=%s, Username='%s', Email='%s'",
+        db_user.id,
+        db_user.username,
+        db_user.email,
+    )
+    return db_user
 
-        db.add(db_user)
-        await db.commit()
-        await db.refresh(db_user)
 
-        logger.info(
-            f"Usuario creado: ID={db_user.id}, Username='{db_user.username}', Email='{db_user.email}'"
+@handle_db_errors("Error al crear usuarios")
+async def create_users_bulk(db: AsyncSession, users: List[UserCreate]) -> List[User]:
+    """
+    Crea varios usuarios en una sola transacción. Los hashes se calculan en
+    paralelo en el pool de hashing y las filas se insertan agrupadas en
+    INSERT ... VALUES (...), (...) RETURNING (insertmanyvalues).
+    """
+    if not users:
+        return []
+    hashed_passwords = await asyncio.gather(
+        *(get_password_hash_async(user.password) for user in users)
+    )
+    try:
+        result = await db.scalars(
+            insert(User).returning(User),
+            [
+                {**user.model_dump(exclude={"password"}), "hashed_password": hashed}
+                for user, hashed in zip(users, hashed_passwords)
+            ],
         )
-        return db_user
+        db_users = result.all()
+        await db.commit()
+        logger.info("Usuarios creados en bloque: %s", len(db_users))
+        return db_users
     except IntegrityError as e:
         await db.rollback()
-        logger.error(f"Error de integridad al crear usuario: {str(e)}")
+        logger.error("Error de integridad al crear usuarios en bloque: %s", e)
+        field = _violated_field(e)
+        if field == "email":
+            raise HTTPException(
+                status_code=400, detail="Algún correo electrónico ya está registrado"
+            )
+        if field == "username":
+            raise HTTPException(
+                status_code=400, detail="Algún nombre de usuario ya está registrado"
+            )
         raise HTTPException(
             status_code=400, detail="Error de integridad en la base de datos"
         )
-    except HTTPException:
-        raise
-    except Exception as e:
-        await db.rollback()
-        logger.error(f"Error inesperado al crear usuario: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al crear usuario")
 
 
+@handle_db_errors("Error al actualizar usuario")
 async def update_user(
     db: AsyncSession, user_id: int, user_update: UserUpdate
 ) -> Optional[User]:
-    """Actualiza un usuario existente"""
-    db_user = await get_user(db, user_id)
-    if not db_user:
-        logger.warning(f"Intento de actualizar usuario no encontrado: ID={user_id}")
-        return None
-    if db_user.is_deleted:
-        raise HTTPException(
-            status_code=400, detail="No se puede actualizar un usuario eliminado"
-        )
-
+    """
+    Actualiza un usuario con un único UPDATE ... RETURNING. Si el nuevo email o
+    username pertenece a otro usuario, la condición NOT EXISTS evita la
+    escritura y solo entonces se consulta qué campo choca.
+    """
     try:
         update_data = user_update.model_dump(exclude_unset=True)
+        new_email = update_data.get("email")
+        new_username = update_data.get("username")
+
+        # La contraseña no es una columna: se guarda su hash
+        password = update_data.pop("password", None)
+        if password:
+            update_data["hashed_password"] = await get_password_hash_async(password)
+
+        stmt = update(User).where(User.id == user_id, User.is_deleted == False)
+        other = aliased(User)
+        collisions = []
+        if new_email is not None:
+            collisions.append(func.lower(other.email) == new_email.lower())
+        if new_username is not None:
+            collisions.append(func.lower(other.username) == new_username.lower())
+        if collisions:
+            # Mismo criterio que los índices ux_users_*_active
+            stmt = stmt.where(
+                ~exists().where(
+                    other.id != user_id,
+                    other.is_deleted == False,
+                    or_(*collisions),
+                )
+            )
 
-        # Evitar duplicados al actualizar email o username
-        if "email" in update_data:
-            existing = await get_user_by_email(db, update_data["email"])
-            if existing and existing.id != user_id:
-                raise HTTPException(status_code=400, detail="El email ya está en uso")
-        if "username" in update_data:
-            existing = await get_user_by_username(db, update_data["username"])
-            if existing and existing.id != user_id:
+        result = await db.execute(
+            stmt.values(**update_data, updated_at=func.now())
+            .returning(User)
+            .execution_options(synchronize_session="fetch")
+        )
+        db_user = result.scalar_one_or_none()
+        if not db_user:
+            # Un único SELECT clasifica el fallo: email o username de otro
+            # usuario, usuario eliminado o usuario inexistente
+            conditions = [User.id == user_id]
+            if new_email is not None:
+                conditions.append(func.lower(User.email) == new_email.lower())
+            if new_username is not None:
+                conditions.append(func.lower(User.username) == new_username.lower())
+            rows = (
+                await db.execute(
+                    select(User.id, User.email, User.username, User.is_deleted)
+                    .where(or_(*conditions))
+                    .execution_options(include_deleted=True)
+                )
+            ).all()
+            # Los usuarios eliminados no bloquean su email ni su username
+            others = [row for row in rows if row.id != user_id and not row.is_deleted]
+            if new_email is not None and any(
+                row.email.lower() == new_email.lower() for row in others
+            ):
+                raise HTTPException(
+                    status_code=400, detail="El correo electrónico ya está en uso"
+                )
+            if new_username is not None and any(
+                row.username.lower() == new_username.lower() for row in others
+            ):
                 raise HTTPException(
                     status_code=400, detail="El nombre de usuario ya está en uso"
                 )
-
-        for key, value in update_data.items():
-            setattr(db_user, key, value)
-        db_user.updated_at = func.now()
+            if any(row.id == user_id for row in rows):
+                raise HTTPException(
+                    status_code=400,
+                    detail="No se puede actualizar un usuario eliminado",
+                )
+            logger.warning(
+                "Intento de actualizar usuario no encontrado: ID=%s", user_id
+            )
+            return None
 
         await db.commit()
-        await db.refresh(db_user)
+        forget_cached_user(user_id)
 
-        logger.info(f"Usuario actualizado: ID={user_id}")
+        logger.info("Usuario actualizado: ID=%s", user_id)
         return db_user
     except IntegrityError as e:
         await db.rollback()
-        logger.error(f"Error de integridad al actualizar usuario {user_id}: {str(e)}")
+        logger.error("Error de integridad al actualizar usuario %s: %s", user_id, e)
+        field = _violated_field(e)
+        if field == "email":
+            raise HTTPException(
+                status_code=400, detail="El correo electrónico ya está en uso"
+            )
+        if field == "username":
+            raise HTTPException(
+                status_code=400, detail="El nombre de usuario ya está en uso"
+            )
         raise HTTPException(status_code=400, detail="Error de integridad")
-    except HTTPException:
-        raise
-    except Exception as e:
-        await db.rollback()
-        logger.error(f"Error al actualizar usuario {user_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al actualizar usuario")
 
 
+@handle_db_errors("Error al eliminar usuario")
 async def delete_user(db: AsyncSession, user_id: int) -> bool:
-    """Elimina un usuario (soft delete)"""
-    db_user = await get_user(db, user_id)
-    if not db_user:
-        logger.warning(f"Intento de eliminar usuario no encontrado: ID={user_id}")
+    """Elimina un usuario (soft delete) con un único UPDATE condicional"""
+    result = await db.execute(
+        update(User)
+        .where(User.id == user_id, User.is_deleted == False)
+        .values(is_deleted=True, deleted_at=func.now())
+        .returning(User.id)
+    )
+    if result.scalar_one_or_none() is None:
+        logger.warning("Intento de eliminar usuario no encontrado: ID=%s", user_id)
         return False
-    if db_user.is_deleted:
-        logger.info(f"Usuario ya está eliminado: ID={user_id}")
-        return True
-
-    try:
-        db_user.soft_delete()
-        await db.commit()
-        logger.info(f"Usuario eliminado (soft): ID={user_id}")
-        return True
-    except Exception as e:
-        await db.rollback()
-        logger.error(f"Error al eliminar usuario {user_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al eliminar usuario")
+    await db.commit()
+    forget_cached_user(user_id)
+    logger.info("Usuario eliminado (soft): ID=%s", user_id)
+    return True
 
 
+@handle_db_errors("Error al restaurar usuario")
 async def restore_user(db: AsyncSession, user_id: int) -> bool:
-    """Restaura un usuario eliminado"""
-    db_user = await get_user(db, user_id)
-    if not db_user:
-        logger.warning(f"Intento de restaurar usuario no encontrado: ID={user_id}")
+    """Restaura un usuario eliminado con un único UPDATE condicional"""
+    result = await db.execute(
+        update(User)
+        .where(User.id == user_id, User.is_deleted == True)
+        .values(is_deleted=False, deleted_at=None)
+        .returning(User.id)
+    )
+    if result.scalar_one_or_none() is None:
+        logger.warning("Usuario eliminado no encontrado: ID=%s", user_id)
         return False
-    if not db_user.is_deleted:
-        logger.info(f"Usuario ya está activo: ID={user_id}")
-        return True
-
-    try:
-        db_user.restore()
-        await db.commit()
-        logger.info(f"Usuario restaurado: ID={user_id}")
-        return True
-    except Exception as e:
-        await db.rollback()
-        logger.error(f"Error al restaurar usuario {user_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error al restaurar usuario")
+    await db.commit()
+    forget_cached_user(user_id)
+    logger.info("Usuario restaurado: ID=%s", user_id)
+    return True
 
 
+@handle_db_errors("Error al obtener usuarios eliminados")
 async def get_deleted_users(
-    db: AsyncSession, skip: int = 0, limit: int = 100
-) -> List[User]:
-    """Obtiene usuarios eliminados"""
-    try:
-        result = await db.execute(
-            select(User)
-            .filter(User.is_deleted == True)
-            .offset(skip)
-            .limit(limit)
-            .order_by(User.deleted_at.desc())
-        )
-        users = list(result.scalars().all())
-        logger.info(f"Obtenidos {len(users)} usuarios eliminados")
-        return users
-    except Exception as e:
-        logger.error(f"Error al obtener usuarios eliminados: {str(e)}")
-        raise HTTPException(
-            status_code=500, detail="Error al obtener usuarios eliminados"
-        )
-
-
-# ========================
-# AUTENTICACIÓN Y SEGURIDAD
-# ========================
-
-
-async def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
-    """Verifica que el usuario esté activo"""
-    if not current_user.is_active:
-        raise HTTPException(status_code=400, detail="Usuario inactivo")
-    return current_user
+    db: AsyncSession, after: Optional[Cursor] = None, limit: int = 100
+) -> Tuple[List[Row], Optional[str]]:
+    """
+    Obtiene usuarios eliminados (columnas de _LIST_COLUMNS) con paginación
+    keyset sobre (deleted_at, id); devuelve (filas, next_cursor).
+    """
+    stmt = keyset_page(
+        select(*_LIST_COLUMNS, User.deleted_at)
+        .filter(User.is_deleted == True)
+        .execution_options(include_deleted=True),
+        User.deleted_at,
+        User.id,
+        after,
+        limit,
+    )
+    result = await db.execute(stmt)
+    users, next_cursor = split_page(result.all(), limit, "deleted_at")
+    logger.info("Obtenidos %s usuarios eliminados", len(users))
+    return (users, next_cursor)
@@ -1,21 +1,78 @@
 import logging
-from fastapi import FastAPI
-from fastapi.responses import RedirectResponse
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, RedirectResponse
 from fastapi.security import OAuth2PasswordBearer
 from app.api.main import api_router
 from app.middleware.logging import ResponseTimeMiddleware
+from app.middleware.query_counter import NPlusOneMiddleware, install_query_counter
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 from starlette.middleware.sessions import SessionMiddleware
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from app.core.logging import logger as crud_logger
 from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine, warm_up_pool
+from app.crud import comment as crud_comment
+from app.crud import post as crud_post
+from app.crud import tag as crud_tag
+from app.crud import user as crud_user
+from app.schemas.error import APIError, ErrorDetail
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="FastAPI Blog API", version="1.0.0")
+
+async def warm_up_query_cache() -> None:
+    """
+    Ejecuta una vez las consultas más frecuentes con valores que no existen,
+    para que su SQL compilado ya esté en la caché del motor al llegar las
+    primeras peticiones. Los avisos de "no encontrado" que provocan esos
+    valores se silencian mientras dura el precalentamiento.
+    """
+    previous_level = crud_logger.level
+    crud_logger.setLevel(logging.ERROR)
+    try:
+        async with AsyncSessionLocal() as session:
+            await crud_user.get_user(session, -1)
+            await crud_user.get_user_by_username(session, "")
+            await crud_user.get_user_by_email(session, "")
+            await crud_user.get_user_with_posts_json(session, -1)
+            await crud_user.get_users(session, limit=1)
+            await crud_post.get_post(session, -1)
+            await crud_post.get_post_author_id(session, -1)
+            await crud_post.get_post_with_comments(session, -1)
+            await crud_post.get_post_bundle(session, -1)
+            await crud_post.get_posts(session, limit=1)
+            await crud_tag.get_tag_with_posts(session, -1)
+            await crud_tag.get_tags(session, limit=1)
+            await crud_comment.get_comment_author_id(session, -1)
+    finally:
+        crud_logger.setLevel(previous_level)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Precalentar el pool: las primeras peticiones no pagan el handshake con la BD
+    try:
+        await warm_up_pool()
+        logger.info("Pool de conexiones precalentado")
+    except Exception as e:
+        logger.warning("No se pudo precalentar el pool de conexiones: %s", e)
+    try:
+        await warm_up_query_cache()
+        logger.info("Caché de consultas precalentada")
+    except Exception as e:
+        logger.warning("No se pudo precalentar la caché de consultas: %s", e)
+    yield
+    await engine.dispose()
+
+
+app = FastAPI(title="FastAPI Blog API", version="1.0.0", lifespan=lifespan)
 
 
 limiter = Limiter(key_func=get_remote_address)
@@ -27,6 +84,58 @@ app.add_middleware(SlowAPIMiddleware)
 # middleware
 app.add_middleware(ResponseTimeMiddleware)
 
+# Detección de consultas N+1 en desarrollo y tests (en tests se registra como
+# ERROR para que la CI pueda fallar al encontrar "Posible consulta N+1")
+if settings.ENVIRONMENT in ("development", "test"):
+    install_query_counter(engine)
+    app.add_middleware(
+        NPlusOneMiddleware,
+        level=logging.ERROR if settings.ENVIRONMENT == "test" else logging.WARNING,
+    )
+
+
+# Errores de validación con el formato de APIError. Los fallos idénticos
+# (mismo campo, mensaje y tipo) reutilizan la misma instancia de ErrorDetail
+@app.exception_handler(RequestValidationError)
+async def validation_error_handler(request: Request, exc: RequestValidationError):
+    error = APIError(
+        message="Error de validación",
+        details=[
+            ErrorDetail.build(err["loc"], err["msg"], err["type"])
+            for err in exc.errors()
+        ],
+    )
+    return JSONResponse(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        content=error.model_dump(mode="json"),
+    )
+
+
+# Manejo centralizado de errores de base de datos
+@app.exception_handler(IntegrityError)
+async def integrity_error_handler(request: Request, exc: IntegrityError):
+    logger.warning(
+        "Error de integridad en %s %s: %s", request.method, request.url.path, exc.orig
+    )
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": "Error de integridad en la base de datos"},
+    )
+
+
+@app.exception_handler(SQLAlchemyError)
+async def sqlalchemy_error_handler(request: Request, exc: SQLAlchemyError):
+    logger.error(
+        "Error de base de datos en %s %s",
+        request.method,
+        request.url.path,
+        exc_info=exc,
+    )
+    return JSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={"detail": "Error interno del servidor"},
+    )
+
 
 app.include_router(api_router, prefix="/api")
 
@@ -40,4 +149,4 @@ async def redirect_to_swagger():
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop", http="httptools")
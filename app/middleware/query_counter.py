@@ -0,0 +1,59 @@
+import logging
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.middleware.base import BaseHTTPMiddleware
+
+# Configurar logger
+logger = logging.getLogger("n_plus_one")
+
+# Sentencias SQL ejecutadas durante la petición en curso (texto -> veces)
+_statements: ContextVar[Optional[Counter]] = ContextVar("statements", default=None)
+
+
+def install_query_counter(engine: AsyncEngine) -> None:
+    """Registra cada sentencia del motor en el contador de la petición actual"""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements = _statements.get()
+        if statements is not None:
+            statements[statement] += 1
+
+
+class NPlusOneMiddleware(BaseHTTPMiddleware):
+    """
+    Detecta consultas N+1 en desarrollo: si la misma sentencia SQL se ejecuta
+    `threshold` veces o más en una petición (típico de cargas perezosas por
+    fila), se registra un aviso con la ruta y la sentencia.
+    """
+
+    def __init__(self, app, threshold: int = 3, level: int = logging.WARNING):
+        super().__init__(app)
+        self.threshold = threshold
+        self.level = level
+
+    async def dispatch(self, request: Request, call_next):
+        statements: Counter = Counter()
+        token = _statements.set(statements)
+        try:
+            response = await call_next(request)
+        finally:
+            _statements.reset(token)
+
+        for statement, times in statements.items():
+            if times >= self.threshold:
+                logger.log(
+                    self.level,
+                    "Posible consulta N+1 detectada en %s %s (%s veces): %s",
+                    request.method,
+                    request.url.path,
+                    times,
+                    statement,
+                )
+
+        return response
@@ -1,6 +1,8 @@
 # app/models/base.py
+from __future__ import annotations
+
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import Boolean, DateTime
+from sqlalchemy import Boolean, DateTime, func
 from datetime import datetime, timezone
 from typing import Optional
 
@@ -17,12 +19,14 @@ class Base(DeclarativeBase):
 
 # ======== Mixins ========
 class TimestampMixin:
+    # Valores por defecto en la BD: el INSERT los devuelve con RETURNING,
+    # sin necesidad de un refresh posterior
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+        DateTime(timezone=True), server_default=func.now()
     )
     updated_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
         onupdate=lambda: datetime.now(timezone.utc),
     )
 
@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 from sqlalchemy import Integer, Text, String, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .base import Base, TimestampMixin, SoftDeleteMixin
@@ -12,13 +14,16 @@ class Comment(Base, TimestampMixin, SoftDeleteMixin):
     __tablename__ = "comments"
     __table_args__ = {"extend_existing": True}
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     post_id: Mapped[int] = mapped_column(Integer, ForeignKey("posts.id"))
     author_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"))
 
-    author: Mapped["User"] = relationship("User", back_populates="comments")
-    post: Mapped["Post"] = relationship("Post", back_populates="comments")
+    # Los esquemas de comentario solo exponen los ids: sin cargas implícitas
+    author: Mapped[User] = relationship("User", back_populates="comments", lazy="raise")
+    post: Mapped[Post] = relationship("Post", back_populates="comments", lazy="raise")
+
+    _REPR_TMPL = "<Comment(id=%s, content='%.50s...')>"
 
     def __repr__(self):
-        return f"<Comment(id={self.id}, content='{self.content[:50]}...')>"
+        return self._REPR_TMPL % (self.id, self.content)
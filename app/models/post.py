@@ -1,4 +1,6 @@
-from sqlalchemy import Boolean, String, Text, Integer, ForeignKey, Table, Column
+from __future__ import annotations
+
+from sqlalchemy import Boolean, String, Text, Integer, ForeignKey, Table, Column, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base, SoftDeleteMixin, TimestampMixin
 from typing import List, TYPE_CHECKING
@@ -21,7 +23,7 @@ post_tags = Table(
 class Post(Base, TimestampMixin, SoftDeleteMixin):
     __tablename__ = "posts"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     title: Mapped[str] = mapped_column(String(200), index=True)
     content: Mapped[str] = mapped_column(Text)
     author_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"))
@@ -30,18 +32,40 @@ class Post(Base, TimestampMixin, SoftDeleteMixin):
     )
     # Columna para la fecha de soft delete, puede ser NULL
 
-    # Relación muchos a uno con User (usar string)
-    author: Mapped["User"] = relationship("User", back_populates="posts")
+    # Relación muchos a uno con User (usar string). A uno: va en el mismo JOIN
+    author: Mapped[User] = relationship("User", back_populates="posts", lazy="joined")
 
-    # Relación uno a muchos con Comment (usar string)
-    comments: Mapped[List["Comment"]] = relationship(
-        "Comment", back_populates="post", cascade="all, delete-orphan"
+    # Relación uno a muchos con Comment (usar string). Solo la vista de
+    # detalle la necesita: hay que pedirla con selectinload, si no falla
+    comments: Mapped[List[Comment]] = relationship(
+        "Comment", back_populates="post", cascade="all, delete-orphan", lazy="raise"
     )
 
-    # Relación muchos a muchos con Tag (usar string)
-    tags: Mapped[List["Tag"]] = relationship(
-        "Tag", secondary=post_tags, back_populates="posts"
+    # Relación muchos a muchos con Tag (usar string). Se pide con selectinload
+    # donde se serializan los tags (_POST_OPTIONS); así los INSERT ... RETURNING
+    # de posts nuevos no lanzan un SELECT de tags que no pueden tener
+    tags: Mapped[List[Tag]] = relationship(
+        "Tag", secondary=post_tags, back_populates="posts", lazy="raise"
     )
 
+    _REPR_TMPL = "<Post(id=%s, title='%s')>"
+
     def __repr__(self):
-        return f"<Post(id={self.id}, title='{self.title}')>"
+        return self._REPR_TMPL % (self.id, self.title)
+
+
+# Índice para la paginación keyset de posts activos (is_deleted, created_at, id)
+Index(
+    "ix_posts_is_deleted_created_at_id",
+    Post.is_deleted,
+    Post.created_at.desc(),
+    Post.id.desc(),
+)
+
+# Índice parcial para la paginación keyset de posts eliminados (deleted_at, id)
+Index(
+    "ix_posts_deleted_at_id_deleted",
+    Post.deleted_at.desc(),
+    Post.id.desc(),
+    postgresql_where=Post.is_deleted == True,
+)
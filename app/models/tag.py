@@ -1,4 +1,6 @@
-from sqlalchemy import Boolean, DateTime, String, Integer
+from __future__ import annotations
+
+from sqlalchemy import Boolean, DateTime, String, Integer, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base, SoftDeleteMixin, TimestampMixin
 from typing import List, TYPE_CHECKING, Optional
@@ -10,16 +12,46 @@ if TYPE_CHECKING:
 class Tag(Base, TimestampMixin, SoftDeleteMixin):
     __tablename__ = "tags"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    name: Mapped[str] = mapped_column(String(50), unique=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(50))
     is_deleted: Mapped[bool] = mapped_column(
         Boolean, default=False, server_default="false", nullable=False
     )
 
     # Relación muchos a muchos con Post (usar string y secondary como string)
-    posts: Mapped[List["Post"]] = relationship(
-        "Post", secondary="post_tags", back_populates="tags"
+    # Se pide con selectinload donde hace falta (get_tag_with_posts); el
+    # acceso implícito falla en vez de lanzar una consulta por tag
+    posts: Mapped[List[Post]] = relationship(
+        "Post", secondary="post_tags", back_populates="tags", lazy="raise"
     )
 
+    _REPR_TMPL = "<Tag(id=%s, name='%s')>"
+
     def __repr__(self):
-        return f"<Tag(id={self.id}, name='{self.name}')>"
+        return self._REPR_TMPL % (self.id, self.name)
+
+
+# Índice para la paginación keyset de tags activos (is_deleted, created_at, id)
+Index(
+    "ix_tags_is_deleted_created_at_id",
+    Tag.is_deleted,
+    Tag.created_at.desc(),
+    Tag.id.desc(),
+)
+
+# Índice parcial para la paginación keyset de tags eliminados (deleted_at, id)
+Index(
+    "ix_tags_deleted_at_id_deleted",
+    Tag.deleted_at.desc(),
+    Tag.id.desc(),
+    postgresql_where=Tag.is_deleted == True,
+)
+
+# Búsqueda por nombre sin distinguir mayúsculas (get_tag_by_name) y unicidad
+# de nombre entre los tags activos
+Index(
+    "ix_tag_name_lower_active",
+    func.lower(Tag.name),
+    unique=True,
+    postgresql_where=Tag.is_deleted == False,
+)
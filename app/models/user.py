@@ -1,4 +1,6 @@
-from sqlalchemy import String, Integer, Boolean
+from __future__ import annotations
+
+from sqlalchemy import String, Integer, Boolean, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base, TimestampMixin, SoftDeleteMixin
 from typing import List, TYPE_CHECKING, Optional
@@ -11,22 +13,61 @@ if TYPE_CHECKING:
 class User(Base, TimestampMixin, SoftDeleteMixin):
     __tablename__ = "users"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    username: Mapped[str] = mapped_column(String(50), unique=True, index=True)
-    email: Mapped[str] = mapped_column(String(100), unique=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    username: Mapped[str] = mapped_column(String(50), index=True)
+    email: Mapped[str] = mapped_column(String(100))
     full_name: Mapped[str] = mapped_column(String(100))
     bio: Mapped[Optional[str]] = mapped_column(String(500))
-    hashed_password: Mapped[str] = mapped_column(String(255))
+    # Diferida: solo la lee el login, que la pide explícitamente (_AUTH_USER);
+    # acceder a ella en un objeto cargado sin undefer() lanza un error
+    hashed_password: Mapped[str] = mapped_column(
+        String(255), deferred=True, deferred_group="auth", deferred_raiseload=True
+    )
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     is_admin: Mapped[bool] = mapped_column(Boolean, default=False)
 
-    # Relación uno a muchos con Post
-    posts: Mapped[List["Post"]] = relationship(
-        "Post", back_populates="author", cascade="all, delete-orphan"
+    # Relación uno a muchos con Post. Las colecciones del usuario no se cargan
+    # nunca de forma implícita: hay que pedirlas con selectinload, si no falla
+    posts: Mapped[List[Post]] = relationship(
+        "Post", back_populates="author", cascade="all, delete-orphan", lazy="raise"
     )
-    comments: Mapped[List["Comment"]] = relationship(
-        "Comment", back_populates="author", cascade="all, delete-orphan"
+    comments: Mapped[List[Comment]] = relationship(
+        "Comment", back_populates="author", cascade="all, delete-orphan", lazy="raise"
     )
 
+    _REPR_TMPL = "<User(id=%s, username='%s')>"
+
     def __repr__(self):
-        return f"<User(id={self.id}, username='{self.username}')>"
+        return self._REPR_TMPL % (self.id, self.username)
+
+
+# Unicidad sin distinguir mayúsculas entre usuarios activos; también sirven a
+# las búsquedas por lower(email) / lower(username)
+Index(
+    "ux_users_email_active",
+    func.lower(User.email),
+    unique=True,
+    postgresql_where=User.is_deleted == False,
+)
+Index(
+    "ux_users_username_active",
+    func.lower(User.username),
+    unique=True,
+    postgresql_where=User.is_deleted == False,
+)
+
+# Índice para la paginación keyset de usuarios activos (is_deleted, created_at, id)
+Index(
+    "ix_users_is_deleted_created_at_id",
+    User.is_deleted,
+    User.created_at.desc(),
+    User.id.desc(),
+)
+
+# Índice parcial para la paginación keyset de usuarios eliminados (deleted_at, id)
+Index(
+    "ix_users_deleted_at_id_deleted",
+    User.deleted_at.desc(),
+    User.id.desc(),
+    postgresql_where=User.is_deleted == True,
+)
@@ -0,0 +1,14 @@
+# app/schemas/__init__.py
+# Los esquemas con referencias cruzadas (UserWithPosts, TagWithPosts,
+# PostWithRelations) solo importan esos tipos bajo TYPE_CHECKING. Aquí se
+# importan todos los módulos una sola vez y cada esquema se reconstruye
+# exactamente una vez, con todos los nombres ya disponibles en este espacio de
+# nombres.
+from app.schemas.comment import Comment
+from app.schemas.user import User, UserWithPosts
+from app.schemas.tag import Tag, TagWithPosts
+from app.schemas.post import Post, PostWithRelations
+
+UserWithPosts.model_rebuild()
+TagWithPosts.model_rebuild()
+PostWithRelations.model_rebuild()
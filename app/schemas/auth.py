@@ -1,4 +1,6 @@
-from pydantic import BaseModel, validator
+from __future__ import annotations
+
+from pydantic import BaseModel, field_validator
 from typing import Optional
 
 
@@ -11,8 +13,9 @@ class TokenData(BaseModel):
     username: str
 
     # Validación adicional para asegurar que no sea string vacío
-    @validator("username")
-    def validate_username(cls, value):
+    @field_validator("username")
+    @classmethod
+    def validate_username(cls, value: str) -> str:
         if not value.strip():
             raise ValueError("Username cannot be empty")
         return value
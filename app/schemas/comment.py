@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from __future__ import annotations
+
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
 
@@ -16,11 +18,10 @@ class CommentUpdate(BaseModel):
 
 
 class Comment(CommentBase):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     id: int
     post_id: int
     author_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
-
-    class Config:
-        from_attributes = True
@@ -1,16 +1,30 @@
 # app/schemas/common.py
-from typing import Generic, TypeVar, List
-from pydantic import BaseModel
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Generic, TypeVar, List, Type
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 
 T = TypeVar("T")  # T puede ser cualquier tipo, incluyendo esquemas Pydantic
+M = TypeVar("M", bound=BaseModel)
+
+
+@lru_cache(maxsize=64)
+def list_adapter(model: Type[M]) -> TypeAdapter[List[M]]:
+    """
+    TypeAdapter de List[model], construido una sola vez por esquema. Valida
+    una lista completa de objetos ORM o filas en una sola llamada al núcleo
+    de pydantic en lugar de un model_validate por elemento.
+    """
+    return TypeAdapter(List[model])
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
+    # Esto es importante para la conversión automática
+    model_config = ConfigDict(from_attributes=True)
+
     items: List[T]
     total: int
     page: int
     size: int
     total_pages: int
-
-    class Config:
-        from_attributes = True  # Esto es importante para la conversión automática
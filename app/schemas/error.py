@@ -1,14 +1,53 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from __future__ import annotations
+
+import sys
+from functools import lru_cache
+
+from pydantic import BaseModel, ConfigDict
+from typing import Iterable, Optional, List, Tuple
+
+# Vocabulario habitual de tipos de error, internado una sola vez
+_ERROR_TYPES = {
+    name: sys.intern(name)
+    for name in (
+        "value_error",
+        "type_error",
+        "missing",
+        "string_too_short",
+        "string_too_long",
+        "json_invalid",
+    )
+}
 
 
 class ErrorDetail(BaseModel):
-    loc: List[str]  # Ubicación del error (ej: ["body", "email"])
+    # Solo se usa al formatear errores: el esquema se construye al primer uso.
+    # Inmutable para poder reutilizar la misma instancia (ver build)
+    model_config = ConfigDict(defer_build=True, frozen=True)
+
+    loc: Tuple[str, ...]  # Ubicación del error (ej: ("body", "email"))
     msg: str  # Mensaje descriptivo
     type: str  # Tipo de error (ej: "value_error")
 
+    @classmethod
+    def build(cls, loc: Iterable, msg: str, type_: str) -> ErrorDetail:
+        """
+        Devuelve el ErrorDetail de (loc, msg, type_), reutilizando la misma
+        instancia para fallos idénticos repetidos
+        """
+        return _cached_error_detail(
+            tuple(str(part) for part in loc), msg, _ERROR_TYPES.get(type_, type_)
+        )
+
+
+@lru_cache(maxsize=1024)
+def _cached_error_detail(loc: Tuple[str, ...], msg: str, type_: str) -> ErrorDetail:
+    return ErrorDetail(loc=loc, msg=msg, type=type_)
+
 
 class APIError(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     success: bool = False
     message: str
     details: Optional[List[ErrorDetail]] = None
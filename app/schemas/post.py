@@ -1,7 +1,14 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from __future__ import annotations
+
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional, TYPE_CHECKING
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from app.schemas.comment import Comment
+    from app.schemas.tag import Tag
+    from app.schemas.user import User
+
 
 class PostBase(BaseModel):
     title: str
@@ -18,32 +25,21 @@ class PostUpdate(BaseModel):
 
 
 class PostInDBBase(PostBase):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     id: int
     author_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
-
 
 class Post(PostInDBBase):
     pass
 
 
 class PostWithRelations(PostInDBBase):
-    author: "User"  # ← Cadena
-    comments: List["Comment"] = []
-    tags: List["Tag"] = []  # ← Cadena
-
-    class Config:
-        from_attributes = True
-
-
-# Importaciones circulares al final
-from app.schemas.user import User
-from app.schemas.comment import Comment
-from app.schemas.tag import Tag
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
-# Reconstruye después de importar
-PostWithRelations.model_rebuild()
+    author: User
+    comments: List[Comment] = []
+    tags: List[Tag] = []
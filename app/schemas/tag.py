@@ -1,8 +1,13 @@
 # app/schemas/tag.py
-from pydantic import BaseModel
-from typing import List, Optional
+from __future__ import annotations
+
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional, TYPE_CHECKING
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from app.schemas.post import Post
+
 
 class TagBase(BaseModel):
     name: str
@@ -17,31 +22,16 @@ class TagUpdate(TagBase):
 
 
 class TagInDBBase(TagBase):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
-
 
 class Tag(TagInDBBase):
     pass
 
 
-class TagWithPosts(BaseModel):
-    id: int
-    name: str
-    created_at: datetime
-    updated_at: Optional[datetime] = None
-    posts: List["Post"] = []  # ← Cadena
-
-    class Config:
-        from_attributes = True
-
-
-# Importaciones circulares al final
-from app.schemas.post import Post
-
-# Reconstruye después de importar
-TagWithPosts.model_rebuild()
+class TagWithPosts(Tag):
+    posts: List[Post] = []
@@ -1,8 +1,13 @@
 # app/schemas/user.py
-from pydantic import BaseModel, EmailStr
-from typing import List, Optional
+from __future__ import annotations
+
+from pydantic import BaseModel, ConfigDict, EmailStr
+from typing import List, Optional, TYPE_CHECKING
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from app.schemas.post import Post
+
 
 class UserBase(BaseModel):
     username: str
@@ -26,35 +31,19 @@ class UserUpdate(BaseModel):
 
 
 class UserInDBBase(UserBase):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    # El email ya se validó al escribirlo: al leerlo de la base de datos basta
+    # con str y se evita pasar otra vez por email-validator
+    email: str
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
-
 
 class User(UserInDBBase):
     pass
 
 
-class UserWithPosts(BaseModel):
-    id: int
-    username: str
-    email: str
-    full_name: str
-    is_active: bool
-    is_admin: bool
-    created_at: datetime
-    updated_at: Optional[datetime] = None
-    posts: List["Post"] = []  # ← Cadena, no importa todavía
-
-    class Config:
-        from_attributes = True
-
-
-# Importaciones circulares al final
-from app.schemas.post import Post
-
-# Reconstruye después de importar
-UserWithPosts.model_rebuild()
+class UserWithPosts(User):
+    posts: List[Post] = []
@@ -0,0 +1,73 @@
+import httpx
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.core.database import get_db
+from app.main import app
+from app.schemas.error import ErrorDetail
+
+pytestmark = pytest.mark.anyio
+
+
+class _FailingSession:
+    """Sesión falsa cuyas consultas fallan con `error`"""
+
+    def __init__(self, error):
+        self.error = error
+
+    async def execute(self, *args, **kwargs):
+        raise self.error
+
+    async def rollback(self):
+        pass
+
+
+@pytest.fixture
+def failing_db():
+    def install(error):
+        async def override():
+            yield _FailingSession(error)
+
+        app.dependency_overrides[get_db] = override
+
+    yield install
+    app.dependency_overrides.pop(get_db, None)
+
+
+async def _get_users():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get("/api/users/")
+
+
+async def test_database_errors_reach_the_global_handler(failing_db):
+    failing_db(OperationalError("SELECT 1", {}, Exception("conexión perdida")))
+    response = await _get_users()
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Error interno del servidor"}
+
+
+async def test_integrity_errors_map_to_400(failing_db):
+    failing_db(IntegrityError("INSERT", {}, Exception("duplicado")))
+    response = await _get_users()
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Error de integridad en la base de datos"}
+
+
+async def test_validation_errors_use_api_error_format(failing_db):
+    failing_db(OperationalError("SELECT 1", {}, Exception("no debería ejecutarse")))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/users/", params={"limit": 0})
+    assert response.status_code == 422
+    body = response.json()
+    assert body["success"] is False
+    assert body["message"] == "Error de validación"
+    assert [d["loc"] for d in body["details"]] == [["query", "limit"]]
+
+
+def test_error_detail_build_reuses_instances():
+    first = ErrorDetail.build(["body", 0, "name"], "Field required", "missing")
+    second = ErrorDetail.build(("body", "0", "name"), "Field required", "missing")
+    assert first is second
+    assert first.loc == ("body", "0", "name")
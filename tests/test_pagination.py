@@ -0,0 +1,115 @@
+import httpx
+import pytest
+
+from app.core.database import get_db
+from app.core.pagination import decode_cursor
+from app.crud import post as crud_post
+from app.crud import tag as crud_tag
+from app.crud import user as crud_user
+from app.main import app
+from app.models import Post, Tag, User
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_post_keyset_pages_follow_the_cursor(db, blog):
+    first, cursor = await crud_post.get_posts(db, limit=1)
+    assert cursor is not None
+    second, cursor = await crud_post.get_posts(db, after=decode_cursor(cursor), limit=1)
+    assert cursor is None
+    assert [first[0].title, second[0].title] == ["Post 1", "Post 0"]
+    assert all(isinstance(post, Post) for post in first + second)
+
+
+async def test_deleted_posts_keyset_page(db, blog):
+    deleted, cursor = await crud_post.get_deleted_posts(db, limit=10)
+    assert cursor is None
+    assert [post.title for post in deleted] == ["Post 2"]
+
+
+async def test_tag_keyset_pages(db, blog):
+    tags, cursor = await crud_tag.get_tags(db, limit=10)
+    assert (cursor, [tag.name for tag in tags]) == (None, ["python"])
+    assert isinstance(tags[0], Tag)
+
+    deleted, cursor = await crud_tag.get_deleted_tags(db, limit=10)
+    assert (cursor, [tag.name for tag in deleted]) == (None, ["sql"])
+
+
+async def test_user_keyset_page_returns_column_rows(db, blog):
+    rows, cursor = await crud_user.get_users(db, limit=10)
+    assert cursor is None
+    assert not isinstance(rows[0], User)
+    assert rows[0].username == "ana"
+
+
+async def test_deleted_users_keyset_page(db, blog):
+    blog["author"].soft_delete()
+    await db.commit()
+    assert (await crud_user.get_users(db, limit=10))[0] == []
+    rows, cursor = await crud_user.get_deleted_users(db, limit=10)
+    assert (cursor, [row.username for row in rows]) == (None, ["ana"])
+
+
+async def test_posts_route_returns_next_cursor_header(db, blog):
+    async def override():
+        yield db
+
+    app.dependency_overrides[get_db] = override
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            first = await client.get("/api/posts/", params={"limit": 1})
+            cursor = first.headers["X-Next-Cursor"]
+            second = await client.get(
+                "/api/posts/", params={"limit": 1, "cursor": cursor}
+            )
+            invalid = await client.get("/api/posts/", params={"cursor": "???"})
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+    assert [post["title"] for post in first.json()] == ["Post 1"]
+    assert [post["title"] for post in second.json()] == ["Post 0"]
+    assert "X-Next-Cursor" not in second.headers
+    assert invalid.status_code == 400
+
+
+async def test_users_route_serializes_column_rows(db, blog):
+    async def override():
+        yield db
+
+    app.dependency_overrides[get_db] = override
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            response = await client.get("/api/users/")
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+    assert response.status_code == 200
+    assert [user["username"] for user in response.json()] == ["ana"]
+    assert "hashed_password" not in response.text
+
+
+async def test_tags_route_includes_posts_on_request(db, blog):
+    post, tag = blog["posts"][0], blog["tags"][0]
+    await crud_post.add_tag_to_post(db, post.id, tag.id)
+    db.expunge_all()
+
+    async def override():
+        yield db
+
+    app.dependency_overrides[get_db] = override
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            plain = await client.get("/api/tags/")
+            with_posts = await client.get("/api/tags/", params={"include_posts": True})
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+    assert "posts" not in plain.json()[0]
+    assert [p["title"] for p in with_posts.json()[0]["posts"]] == ["Post 0"]
@@ -0,0 +1,37 @@
+import pytest
+
+from app.crud import post as crud_post
+from app.schemas.post import PostCreate
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_add_tag_to_post_is_idempotent(db, blog):
+    post, tag = blog["posts"][0], blog["tags"][0]
+    assert await crud_post.add_tag_to_post(db, post.id, tag.id)
+    assert await crud_post.add_tag_to_post(db, post.id, tag.id)
+
+
+async def test_add_tag_to_post_rejects_deleted_rows(db, blog):
+    active_post, deleted_post = blog["posts"][0], blog["posts"][2]
+    active_tag, deleted_tag = blog["tags"]
+    assert not await crud_post.add_tag_to_post(db, active_post.id, deleted_tag.id)
+    assert not await crud_post.add_tag_to_post(db, deleted_post.id, active_tag.id)
+    assert not await crud_post.add_tag_to_post(db, active_post.id, 999)
+
+
+async def test_create_post_does_not_load_tags(db, blog, queries):
+    queries.clear()
+    post = await crud_post.create_post(
+        db, PostCreate(title="Nuevo", content="..."), author_id=blog["author"].id
+    )
+    assert post.id is not None
+    assert not [s for s in queries if "post_tags" in s]
+
+
+async def test_post_detail_loads_tags(db, blog):
+    post, tag = blog["posts"][0], blog["tags"][0]
+    await crud_post.add_tag_to_post(db, post.id, tag.id)
+    db.expunge_all()
+    detail = await crud_post.get_post_with_comments(db, post.id)
+    assert [t.name for t in detail.tags] == ["python"]
@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+
+from app.crud import post as crud_post
+from app.crud import tag as crud_tag
+from app.models import Post
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def many_posts(db, blog):
+    """Veinte posts más, todos con el tag activo"""
+    tag = blog["tags"][0]
+    posts = [
+        Post(title=f"Extra {i}", content="...", author_id=blog["author"].id)
+        for i in range(20)
+    ]
+    db.add_all(posts)
+    await db.commit()
+    for post in posts:
+        await crud_post.add_tag_to_post(db, post.id, tag.id)
+    db.expunge_all()
+    return posts
+
+
+async def test_post_list_query_count_does_not_grow(db, many_posts, queries):
+    queries.clear()
+    posts, next_cursor = await crud_post.get_posts(db, limit=50)
+    assert (len(posts), next_cursor) == (22, None)
+    assert len(queries) <= 3
+
+
+async def test_tag_with_posts_loads_posts_in_one_batch(db, blog, many_posts, queries):
+    queries.clear()
+    tag = await crud_tag.get_tag_with_posts(db, blog["tags"][0].id)
+    assert len(tag.posts) == 20
+    assert len(queries) <= 3
+    with pytest.raises(InvalidRequestError):
+        tag.posts[0].author
+
+
+async def test_post_detail_raises_on_unloaded_relationships(db, blog, queries):
+    db.expunge_all()
+    queries.clear()
+    post = await crud_post.get_post_with_comments(db, blog["posts"][0].id)
+    assert post.author.username == "ana"
+    assert post.comments == [] and post.tags == []
+    assert len(queries) <= 3
+    with pytest.raises(InvalidRequestError):
+        post.author.posts
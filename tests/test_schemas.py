@@ -0,0 +1,33 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.common import list_adapter
+from app.schemas.tag import Tag
+
+
+def test_list_adapter_is_cached_per_model():
+    assert list_adapter(Tag) is list_adapter(Tag)
+
+
+def test_list_adapter_builds_complete_objects():
+    now = datetime.now()
+    (tag,) = list_adapter(Tag).validate_python(
+        [SimpleNamespace(id=1, name="python", created_at=now, updated_at=None)],
+        from_attributes=True,
+    )
+    assert (tag.id, tag.name, tag.created_at, tag.updated_at) == (
+        1,
+        "python",
+        now,
+        None,
+    )
+
+
+def test_list_adapter_rejects_missing_required_fields():
+    with pytest.raises(ValidationError):
+        list_adapter(Tag).validate_python(
+            [SimpleNamespace(updated_at=None)], from_attributes=True
+        )
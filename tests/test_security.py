@@ -0,0 +1,71 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import deps, security
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def bcrypt_calls(monkeypatch):
+    """Cuenta las verificaciones bcrypt reales y vacía la caché de logins"""
+    calls = []
+    verify = security.verify_password
+
+    def counting_verify(plain_password, hashed_password):
+        calls.append(plain_password)
+        return verify(plain_password, hashed_password)
+
+    monkeypatch.setattr(security, "verify_password", counting_verify)
+    security._login_cache.clear()
+    yield calls
+    security._login_cache.clear()
+
+
+def test_password_hash_stays_under_interactive_budget():
+    start = time.perf_counter()
+    hashed = security.get_password_hash("una-contraseña-larga")
+    elapsed = time.perf_counter() - start
+    assert security.verify_password("una-contraseña-larga", hashed)
+    assert elapsed < 0.5
+
+
+async def test_successful_login_is_cached(bcrypt_calls):
+    hashed = await security.get_password_hash_async("secreto")
+    assert await security.verify_password_cached("ana", "secreto", hashed)
+    assert await security.verify_password_cached("ana", "secreto", hashed)
+    assert bcrypt_calls == ["secreto"]
+
+
+async def test_failed_login_is_not_cached(bcrypt_calls):
+    hashed = await security.get_password_hash_async("secreto")
+    assert not await security.verify_password_cached("ana", "otra", hashed)
+    assert not await security.verify_password_cached("ana", "otra", hashed)
+    assert len(bcrypt_calls) == 2
+
+
+async def test_cache_entry_is_ignored_after_password_change(bcrypt_calls):
+    old_hash = await security.get_password_hash_async("secreto")
+    assert await security.verify_password_cached("ana", "secreto", old_hash)
+    new_hash = await security.get_password_hash_async("nuevo")
+    assert not await security.verify_password_cached("ana", "secreto", new_hash)
+    assert len(bcrypt_calls) == 2
+
+
+def test_forget_cached_user_drops_only_that_users_tokens():
+    deps._auth_cache.clear()
+    deps._user_token_keys.clear()
+    ana, luis = SimpleNamespace(id=1), SimpleNamespace(id=2)
+    exp = time.time() + 60
+    deps._cache_user(deps._token_key("a1"), ana, exp)
+    deps._cache_user(deps._token_key("a2"), ana, exp)
+    deps._cache_user(deps._token_key("l1"), luis, exp)
+
+    deps.forget_cached_user(ana.id)
+
+    assert list(deps._auth_cache) == [deps._token_key("l1")]
+    assert 1 not in deps._user_token_keys
+    deps._auth_cache.clear()
+    deps._user_token_keys.clear()
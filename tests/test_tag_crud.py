@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import select
+
+from app.crud import post as crud_post
+from app.crud import tag as crud_tag
+from app.models import Tag
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_get_tag_skips_deleted_tags(db, blog):
+    active, deleted = blog["tags"]
+    db.expunge_all()
+    assert (await crud_tag.get_tag(db, active.id)).name == "python"
+    assert await crud_tag.get_tag(db, deleted.id) is None
+
+
+async def test_get_tag_skips_deleted_tags_in_identity_map(db, blog):
+    deleted = blog["tags"][1]
+    assert await crud_tag.get_tag(db, deleted.id) is None
+
+
+async def test_get_tag_by_name_is_case_insensitive(db, blog):
+    assert (await crud_tag.get_tag_by_name(db, "PyThOn")).name == "python"
+    assert await crud_tag.get_tag_by_name(db, "SQL") is None
+
+
+async def test_orm_selects_exclude_soft_deleted_rows(db, blog):
+    tags = (await db.scalars(select(Tag))).all()
+    assert [tag.name for tag in tags] == ["python"]
+
+
+async def test_include_deleted_returns_soft_deleted_rows(db, blog):
+    tags = (
+        await db.scalars(
+            select(Tag).order_by(Tag.id).execution_options(include_deleted=True)
+        )
+    ).all()
+    assert [tag.name for tag in tags] == ["python", "sql"]
+
+
+async def test_get_tags_streams_posts_when_requested(db, blog):
+    post, tag = blog["posts"][0], blog["tags"][0]
+    await crud_post.add_tag_to_post(db, post.id, tag.id)
+    db.expunge_all()
+    tags, cursor = await crud_tag.get_tags(db, limit=10, include_posts=True)
+    assert cursor is None
+    assert [(t.name, [p.title for p in t.posts]) for t in tags] == [
+        ("python", ["Post 0"])
+    ]
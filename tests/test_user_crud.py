@@ -0,0 +1,28 @@
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+
+from app.crud import user as crud_user
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_get_user_with_posts_runs_fixed_queries(db, blog, queries):
+    db.expunge_all()
+    queries.clear()
+    user = await crud_user.get_user_with_posts(db, blog["author"].id)
+    # usuario + posts + comentarios + tags, sin importar cuántos posts tenga
+    assert len(queries) == 4
+    assert [post.title for post in sorted(user.posts, key=lambda p: p.id)] == [
+        "Post 0",
+        "Post 1",
+    ]
+    for post in user.posts:
+        assert post.comments == [] and post.tags == []
+    assert len(queries) == 4
+
+
+async def test_get_user_with_posts_raises_on_unloaded_relationships(db, blog):
+    db.expunge_all()
+    user = await crud_user.get_user_with_posts(db, blog["author"].id)
+    with pytest.raises(InvalidRequestError):
+        user.comments